@@ -0,0 +1,221 @@
+"""
+Benchmark the sync views under gunicorn against the async views under uvicorn.
+
+The script starts both servers on the configured database, then sends the
+same mix of requests (``/notes/``, ``/note/<id>/``, ``/search/``) to both,
+at increasing concurrency: gunicorn serves the synchronous views, and
+uvicorn the async views that asgi.py puts at the same URLs. Each request
+opens its own connection, since gunicorn's sync workers do not keep
+connections alive.
+
+List requests carry a unique query parameter so that neither server
+serves them from its page cache.
+
+Usage (from the project root, with gunicorn and uvicorn installed)::
+
+    python benchmarks/async_vs_sync.py --seed 2000
+    python benchmarks/async_vs_sync.py --concurrency 50 200 500 --json
+
+``--seed`` adds benchmark notes to the configured database until it holds
+at least that many active notes.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+HOST = '127.0.0.1'
+
+
+def setup_django():
+    """Make the project importable and configure Django."""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                          'sticky_notes_project.settings')
+    import django
+    django.setup()
+
+
+def seed_notes(minimum):
+    """
+    Create benchmark notes until there are at least ``minimum`` active ones.
+
+    Returns:
+        list: Primary keys of up to 100 active notes, for detail requests
+    """
+    from sticky_notes_app.models import Note
+
+    missing = minimum - Note.objects.active().count()
+    if missing > 0:
+        categories = [value for value, _ in Note.CATEGORY_CHOICES]
+        priorities = [value for value, _ in Note.PRIORITY_CHOICES]
+        Note.objects.bulk_create(
+            (Note(title=f'Benchmark note {number}',
+                  content=f'Benchmark content {number} ' * 20,
+                  category=categories[number % len(categories)],
+                  priority=priorities[number % len(priorities)])
+             for number in range(missing)),
+            batch_size=500,
+        )
+    return list(Note.objects.active().values_list('pk', flat=True)[:100])
+
+
+def request_paths(note_ids):
+    """
+    Yield an endless mix of list, detail and search paths.
+
+    Args:
+        note_ids (list): Notes to request detail pages for
+    """
+    counter = itertools.count()
+    detail_ids = itertools.cycle(note_ids)
+    while True:
+        number = next(counter)
+        yield f'/notes/?page={number % 5 + 1}&_={number}'
+        yield f'/note/{next(detail_ids)}/'
+        yield f'/search/?search_query=benchmark&page={number % 3 + 1}'
+
+
+async def fetch(port, path):
+    """
+    Send one GET request on a new connection.
+
+    Returns:
+        int: The response status code, or 0 on a connection error
+    """
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\n'
+            f'Connection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return int(response.split(b' ', 2)[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+async def run_load(port, paths, total, concurrency):
+    """
+    Send ``total`` requests with ``concurrency`` requests in flight.
+
+    Returns:
+        dict: Throughput, latency percentiles (ms) and error count
+    """
+    latencies = []
+    errors = 0
+    remaining = itertools.count()
+
+    async def client():
+        nonlocal errors
+        while next(remaining) < total:
+            start = time.perf_counter()
+            status = await fetch(port, next(paths))
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(quantiles[49] * 1000, 1),
+        'p95_ms': round(quantiles[94] * 1000, 1),
+        'p99_ms': round(quantiles[98] * 1000, 1),
+    }
+
+
+def start_server(command, port):
+    """Start a server process and wait until it accepts connections."""
+    process = subprocess.Popen(
+        command, cwd=BASE_DIR,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if asyncio.run(fetch(port, '/notes/')) == 200:
+            return process
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not start: {' '.join(command)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[10, 50, 200],
+                        help='Requests in flight, one run per value')
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Requests per run')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Worker processes per server')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Minimum number of active notes')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the results as JSON')
+    args = parser.parse_args()
+
+    setup_django()
+    note_ids = seed_notes(args.seed)
+    if not note_ids:
+        parser.error('The database has no active notes; use --seed.')
+
+    servers = {
+        'sync (gunicorn, WSGI)': (
+            ['gunicorn', 'sticky_notes_project.wsgi:application',
+             '--workers', str(args.workers), '--bind', f'{HOST}:8301'],
+            8301,
+        ),
+        'async (uvicorn, ASGI)': (
+            ['uvicorn', 'sticky_notes_project.asgi:application',
+             '--workers', str(args.workers), '--host', HOST,
+             '--port', '8302', '--no-access-log'],
+            8302,
+        ),
+    }
+
+    results = []
+    for name, (command, port) in servers.items():
+        process = start_server(command, port)
+        try:
+            for concurrency in args.concurrency:
+                paths = request_paths(note_ids)
+                result = asyncio.run(
+                    run_load(port, paths, args.requests, concurrency)
+                )
+                results.append(
+                    {'server': name, 'concurrency': concurrency, **result}
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'server':<24}{'conc':>6}{'req/s':>9}{'p50':>8}{'p95':>8}"
+          f"{'p99':>8}{'errors':>8}")
+    for row in results:
+        print(f"{row['server']:<24}{row['concurrency']:>6}"
+              f"{row['requests_per_second']:>9}{row['p50_ms']:>8}"
+              f"{row['p95_ms']:>8}{row['p99_ms']:>8}{row['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Measure what opening a database connection per request costs.
+
+The script sends requests through the project's WSGI handler in-process,
+from several threads like a threaded server, so Django opens and closes
+connections exactly as it would behind gunicorn. It runs the same load
+with a new connection per request (CONN_MAX_AGE=0), with persistent
+connections and, when DB_POOL is enabled on PostgreSQL, with the
+connection pool, and reports the connections opened and the time per
+request of each.
+
+Usage (from the project root)::
+
+    python benchmarks/connection_overhead.py --seed 100
+    DATABASE_URL=postgresql://... python benchmarks/connection_overhead.py
+    DATABASE_URL=postgresql://... DB_POOL=True \\
+        python benchmarks/connection_overhead.py --json
+
+``--seed`` adds benchmark notes until the database holds at least that
+many active notes.
+"""
+
+import argparse
+import itertools
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from async_vs_sync import seed_notes, setup_django
+
+
+class ConnectionCounter:
+    """Counts the connections Django opens, across threads."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, sender, connection, **kwargs):
+        with self._lock:
+            self.count += 1
+
+
+@contextmanager
+def connection_mode(max_age, pool):
+    """
+    Switch the default database to a connection mode for one run.
+
+    Args:
+        max_age (int): CONN_MAX_AGE to use
+        pool (dict): Pool options to use, or None for plain connections
+    """
+    from django.db import connections
+
+    settings_dict = connections['default'].settings_dict
+    saved = settings_dict['CONN_MAX_AGE'], dict(settings_dict['OPTIONS'])
+    settings_dict['CONN_MAX_AGE'] = max_age
+    settings_dict['OPTIONS'].pop('pool', None)
+    if pool:
+        settings_dict['OPTIONS']['pool'] = pool
+    try:
+        yield
+    finally:
+        connections.close_all()
+        settings_dict['CONN_MAX_AGE'], settings_dict['OPTIONS'] = saved
+
+
+def run_load(paths, total, threads):
+    """
+    Send ``total`` requests through the WSGI handler from ``threads``.
+
+    Returns:
+        dict: Requests per second, latency percentiles (ms) and errors
+    """
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from django.test import RequestFactory
+
+    handler = WSGIHandler()
+    factory = RequestFactory(SERVER_NAME='127.0.0.1')
+    remaining = itertools.count()
+    latencies = []
+    errors = []
+
+    def start_response(status, headers):
+        if not status.startswith('200'):
+            errors.append(status)
+
+    def worker():
+        try:
+            while next(remaining) < total:
+                environ = factory.get(next(paths)).environ
+                start = time.perf_counter()
+                response = handler(environ, start_response)
+                b''.join(response)
+                # Closing the response ends the request, which is when
+                # Django closes connections older than CONN_MAX_AGE
+                response.close()
+                latencies.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for future in [executor.submit(worker) for _ in range(threads)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'p95_ms': round(quantiles[94] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Requests per run')
+    parser.add_argument('--threads', type=int, default=4,
+                        help='Concurrent request threads')
+    parser.add_argument('--max-age', type=int, default=600,
+                        help='CONN_MAX_AGE of the persistent run')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Minimum number of active notes')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the results as JSON')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    note_ids = seed_notes(args.seed)
+    if not note_ids:
+        parser.error('The database has no active notes; use --seed.')
+    pool = connections['default'].settings_dict['OPTIONS'].get('pool')
+    connections.close_all()
+
+    modes = {
+        'new connection per request': (0, None),
+        f'persistent (CONN_MAX_AGE={args.max_age})': (args.max_age, None),
+    }
+    if pool:
+        modes['pool (DB_POOL)'] = (0, pool)
+
+    results = []
+    for name, (max_age, pool_options) in modes.items():
+        # The API detail endpoint runs a single small query, so the cost
+        # of connecting is not hidden by the work of the request
+        paths = itertools.cycle([f'/api/notes/{pk}/' for pk in note_ids])
+        counter = ConnectionCounter()
+        connection_created.connect(counter)
+        try:
+            with connection_mode(max_age, pool_options):
+                result = run_load(paths, args.requests, args.threads)
+                if pool_options:
+                    # Checkouts from the pool also send connection_created
+                    stats = connections['default'].pool.get_stats()
+                    counter.count = stats.get('connections_num', 0)
+        finally:
+            connection_created.disconnect(counter)
+        results.append(
+            {'mode': name, 'connections_opened': counter.count, **result}
+        )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<36}{'conns':>7}{'req/s':>9}{'mean ms':>9}"
+          f"{'p95 ms':>9}{'errors':>8}")
+    for row in results:
+        print(f"{row['mode']:<36}{row['connections_opened']:>7}"
+              f"{row['requests_per_second']:>9}{row['mean_ms']:>9}"
+              f"{row['p95_ms']:>9}{row['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
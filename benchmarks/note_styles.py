@@ -0,0 +1,177 @@
+"""
+Measure the category and priority helpers of notes, old and new.
+
+The note cards call get_category_color(), get_priority_color() and the two
+get_*_display() methods once each. The helpers used to build a dictionary
+on every call (the display methods are generated by Django, which also
+builds a dictionary of the choices per call); they now look values up in
+the StyleMap tables built once from the choices.
+
+The script times both implementations on the same unsaved notes: first
+the four helper calls per note alone, then rendering the whole note card
+template. No database is needed.
+
+Usage (from the project root)::
+
+    python benchmarks/note_styles.py
+    python benchmarks/note_styles.py --notes 100000 --repeat 7 --json
+"""
+
+import argparse
+import json
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from unittest import mock
+
+from async_vs_sync import setup_django
+
+# Notes rendered per timing
+NOTES = 10000
+
+# Timings per implementation; the best is reported
+REPEAT = 5
+
+# The helpers a note card calls
+HELPERS = ('get_category_color', 'get_priority_color',
+           'get_category_display', 'get_priority_display')
+
+
+def legacy_priority_color(note):
+    """get_priority_color() as it was, building its dict per call."""
+    priority_colors = {
+        'low': 'priority-low',
+        'medium': 'priority-medium',
+        'high': 'priority-high',
+        'urgent': 'priority-urgent',
+    }
+    return priority_colors.get(note.priority, 'priority-medium')
+
+
+def legacy_category_color(note):
+    """get_category_color() as it was, building its dict per call."""
+    category_colors = {
+        'personal': 'category-personal',
+        'work': 'category-work',
+        'shopping': 'category-shopping',
+        'ideas': 'category-ideas',
+        'reminders': 'category-reminders',
+        'other': 'category-other',
+    }
+    return category_colors.get(note.category, 'category-other')
+
+
+@contextmanager
+def legacy_helpers():
+    """Swap the old implementations into Note while active."""
+    from sticky_notes_app.models import Note
+
+    category = Note._meta.get_field('category')
+    priority = Note._meta.get_field('priority')
+    legacy = {
+        'get_category_color': legacy_category_color,
+        'get_priority_color': legacy_priority_color,
+        # What Django generates when the model does not define them
+        'get_category_display': (
+            lambda note: note._get_FIELD_display(category)
+        ),
+        'get_priority_display': (
+            lambda note: note._get_FIELD_display(priority)
+        ),
+    }
+    with mock.patch.multiple(Note, **legacy):
+        yield
+
+
+def make_notes(count):
+    """Build unsaved notes with every category and priority."""
+    from sticky_notes_app.models import Note
+
+    rng = random.Random(0)
+    categories = [value for value, _ in Note.CATEGORY_CHOICES]
+    priorities = [value for value, _ in Note.PRIORITY_CHOICES]
+    updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    notes = []
+    for pk in range(1, count + 1):
+        note = Note(pk=pk, title=f'Note {pk}', category=rng.choice(categories),
+                    priority=rng.choice(priorities), updated_at=updated_at)
+        note.content_preview = 'Benchmark content'
+        note.content_truncated = False
+        notes.append(note)
+    return notes
+
+
+def call_helpers(notes):
+    """Call the four card helpers of every note."""
+    for note in notes:
+        note.get_category_color()
+        note.get_priority_color()
+        note.get_category_display()
+        note.get_priority_display()
+
+
+def render_cards(notes):
+    """Render the note card template for every note."""
+    from django.template.loader import get_template
+
+    template = get_template('sticky_notes_app/note_card.html')
+    for note in notes:
+        template.render({'note': note})
+
+
+def best_time(function, notes, repeat):
+    """Return the fastest of ``repeat`` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(notes)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--notes', type=int, default=NOTES,
+                        help='Notes per timing')
+    parser.add_argument('--repeat', type=int, default=REPEAT,
+                        help='Timings per implementation (best is kept)')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the results as JSON')
+    args = parser.parse_args()
+
+    setup_django()
+    notes = make_notes(args.notes)
+
+    results = {}
+    for name, function in (('helpers', call_helpers),
+                           ('cards', render_cards)):
+        with legacy_helpers():
+            # Both implementations must render the same cards
+            legacy_output = [getattr(notes[0], helper)()
+                             for helper in HELPERS]
+            legacy = best_time(function, notes, args.repeat)
+        current_output = [getattr(notes[0], helper)() for helper in HELPERS]
+        if legacy_output != current_output:
+            raise SystemExit(f'Outputs differ: {legacy_output} '
+                             f'!= {current_output}')
+        current = best_time(function, notes, args.repeat)
+        results[name] = {
+            'legacy_ms': round(legacy, 2),
+            'current_ms': round(current, 2),
+            'saved': round(1 - current / legacy, 3) if legacy else 0,
+        }
+
+    if args.json:
+        print(json.dumps({'notes': args.notes, 'results': results},
+                         indent=2))
+        return
+    print(f"{args.notes} notes, best of {args.repeat}")
+    print(f"{'':<10}{'legacy ms':>12}{'current ms':>12}{'saved':>8}")
+    for name, row in results.items():
+        print(f"{name:<10}{row['legacy_ms']:>12}{row['current_ms']:>12}"
+              f"{row['saved']:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
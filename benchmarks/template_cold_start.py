@@ -0,0 +1,191 @@
+"""
+Measure the cold start of a worker with and without the template warm-up.
+
+Each run starts a fresh Python process with the production profile
+(``DEBUG=False``), loads the WSGI application as a server worker would,
+then sends it requests for the main pages, once each and once more. Half of the runs
+have ``TEMPLATE_WARMUP`` off, so the first requests compile the templates;
+the other half compile them while the application loads. The script
+reports the median time to load the application, the first and the
+repeated request of each page, and the time from process start to the
+first response of the note list.
+
+Usage (from the project root)::
+
+    python benchmarks/template_cold_start.py
+    python benchmarks/template_cold_start.py --runs 20 --json
+
+The processes use the configured database; ``--seed`` adds benchmark
+notes until it holds at least that many active notes. Static files must
+have been collected for the production profile; the script runs
+``collectstatic`` first if they have not.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from async_vs_sync import BASE_DIR, seed_notes, setup_django
+
+# Fresh processes started per mode
+RUNS = 10
+
+# Environment of the production profile
+PRODUCTION_ENV = {
+    'DEBUG': 'False',
+    'SECRET_KEY': 'template-cold-start-benchmark',
+    'ALLOWED_HOSTS': 'testserver',
+}
+
+
+def pages(note_id):
+    """Return the paths requested by each process."""
+    from sticky_notes_app.management.commands.generate_notes import (
+        RARE_WORDS
+    )
+    # A rare word keeps the search about the templates, not the database
+    return {
+        'list': '/notes/',
+        'detail': f'/note/{note_id}/',
+        'search': f'/search/?search_query={RARE_WORDS[0]}',
+        'create': '/note/new/',
+    }
+
+
+def wsgi_get(application, url):
+    """
+    Send a GET request straight to a WSGI application.
+
+    Returns:
+        str: The response status
+    """
+    parts = urlsplit(url)
+    environ = {'PATH_INFO': parts.path, 'QUERY_STRING': parts.query,
+               'HTTP_HOST': 'testserver'}
+    setup_testing_defaults(environ)
+    status = []
+
+    def start_response(response_status, headers, exc_info=None):
+        status.append(response_status)
+
+    response = application(environ, start_response)
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return status[0]
+
+
+def child(note_id):
+    """
+    Time one worker start, in this process, and print the result as JSON.
+
+    Args:
+        note_id (int): Note of the detail page
+    """
+    start = time.perf_counter()
+    sys.path.insert(0, str(BASE_DIR))
+    from sticky_notes_project.wsgi import application
+    loaded = time.perf_counter()
+
+    result = {'load_ms': (loaded - start) * 1000}
+    for repeat in ('first', 'repeat'):
+        for name, path in pages(note_id).items():
+            # A distinct query string each time bypasses the page cache
+            separator = '&' if '?' in path else '?'
+            request_start = time.perf_counter()
+            status = wsgi_get(application, f'{path}{separator}run={repeat}')
+            elapsed = time.perf_counter() - request_start
+            if not status.startswith('200'):
+                raise SystemExit(f'{path} returned {status}')
+            result[f'{name}_{repeat}_ms'] = elapsed * 1000
+            if repeat == 'first' and name == 'list':
+                result['first_response_ms'] = (
+                    time.perf_counter() - start
+                ) * 1000
+    print(json.dumps(result))
+
+
+def run_child(note_id, warmup):
+    """
+    Start a fresh process for one run.
+
+    Args:
+        note_id (int): Note of the detail page
+        warmup (bool): Whether the process warms up its templates
+
+    Returns:
+        dict: The timings reported by the process
+    """
+    env = {
+        **os.environ, **PRODUCTION_ENV,
+        'TEMPLATE_WARMUP': str(warmup),
+    }
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', str(note_id)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def collect_static():
+    """Collect the static files for the production profile if needed."""
+    if not (BASE_DIR / 'staticfiles' / 'staticfiles.json').exists():
+        subprocess.run(
+            [sys.executable, 'manage.py', 'collectstatic', '--noinput',
+             '--verbosity', '0'],
+            cwd=BASE_DIR, env={**os.environ, **PRODUCTION_ENV}, check=True,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=RUNS,
+                        help='Processes started per mode')
+    parser.add_argument('--seed', type=int, default=100,
+                        help='Minimum number of active notes')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the results as JSON')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child)
+        return
+
+    setup_django()
+    note_id = seed_notes(args.seed)[0]
+    collect_static()
+
+    modes = {'cold': False, 'warm-up': True}
+    runs = {mode: [] for mode in modes}
+    # Modes alternate, so that drift on the machine affects both alike
+    for _ in range(args.runs):
+        for mode, warmup in modes.items():
+            runs[mode].append(run_child(note_id, warmup))
+    results = {
+        mode: {
+            key: round(statistics.median(run[key] for run in mode_runs), 2)
+            for key in mode_runs[0]
+        }
+        for mode, mode_runs in runs.items()
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    keys = list(results['cold'])
+    print(f"{'median (ms)':<22}" + ''.join(f'{mode:>10}' for mode in results))
+    for key in keys:
+        print(f"{key[:-3]:<22}"
+              + ''.join(f'{results[mode][key]:>10}' for mode in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""
+Measure the latency and database work of the main views at scale.
+
+The script drives the list, search, detail and archive views through
+Django's test client, in-process, against the configured database. For
+each scenario it reports latency percentiles, the queries one request
+runs and the rows they read, and it saves the results as JSON so that a
+later run can be compared against them.
+
+By default the note caches are cleared before every request, so the
+numbers show the database work of a cache miss; ``--warm-cache`` measures
+cache hits instead.
+
+Usage (from the project root)::
+
+    python manage.py generate_notes 1000000
+    python benchmarks/view_latency.py --output baseline.json
+    python benchmarks/view_latency.py --compare baseline.json
+    python benchmarks/view_latency.py --notes 100000 --scenarios search_rare
+
+``--notes`` generates notes with ``generate_notes`` until the database
+holds at least that many. ``--compare`` exits with status 1 when a
+scenario's p95 latency grew by more than ``--threshold`` or it runs more
+queries than in the baseline.
+
+Rows read are taken from ``EXPLAIN ANALYZE`` on PostgreSQL. SQLite cannot
+report them, so there the number of full table scans in the query plans
+is reported instead.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+
+from async_vs_sync import BASE_DIR, setup_django
+
+# Requests timed per scenario
+ITERATIONS = 50
+
+# Untimed requests sent before each scenario
+WARMUP = 5
+
+# Page number requested by the deep-page scenario
+DEEP_PAGE = 100
+
+# Growth of p95 latency tolerated by --compare (0.2 = 20%)
+THRESHOLD = 0.2
+
+
+def scenarios(note_id, common_word, rare_word, deep_page):
+    """
+    Build the benchmark scenarios.
+
+    Args:
+        note_id (int): Active note for the detail and archive scenarios
+        common_word (str): Search term matching many notes
+        rare_word (str): Search term matching few notes
+        deep_page (int): Page number of the deep-page scenario
+
+    Returns:
+        dict: Scenario name to (method, path, data)
+    """
+    return {
+        'list_first_page': ('get', '/notes/', {}),
+        'list_deep_page': ('get', '/notes/', {'page': deep_page}),
+        'list_filtered': ('get', '/notes/', {
+            'category_filter': 'work', 'priority_filter': 'urgent',
+        }),
+        'list_cursor': ('get', '/notes/', {'pagination': 'cursor'}),
+        'search_common': ('get', '/search/', {'search_query': common_word}),
+        'search_rare': ('get', '/search/', {'search_query': rare_word}),
+        'detail': ('get', f'/note/{note_id}/', {}),
+        'archive_toggle': ('post', f'/note/{note_id}/archive/', {}),
+    }
+
+
+def plan_rows(plan):
+    """Sum the rows read by the scan nodes of a PostgreSQL plan."""
+    rows = 0
+    if 'Scan' in plan.get('Node Type', ''):
+        loops = plan.get('Actual Loops', 1)
+        rows += (plan.get('Actual Rows', 0)
+                 + plan.get('Rows Removed by Filter', 0)) * loops
+    for child in plan.get('Plans', []):
+        rows += plan_rows(child)
+    return rows
+
+
+def explain(connection, sql):
+    """
+    Measure what a captured SELECT reads.
+
+    Args:
+        connection: The connection that ran the query
+        sql (str): The query, with its parameters interpolated
+
+    Returns:
+        tuple: (rows read or None, number of full table scans or None)
+    """
+    from django.db import DatabaseError
+
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}')
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return plan_rows(plan[0]['Plan']), None
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                details = [row[-1] for row in cursor.fetchall()]
+                scans = sum(
+                    1 for detail in details
+                    if detail.startswith('SCAN') and 'INDEX' not in detail
+                    and 'VIRTUAL TABLE' not in detail
+                )
+                return None, scans
+    except DatabaseError:
+        pass
+    return None, None
+
+
+def profile(client, method, path, data):
+    """
+    Run one request and measure its queries.
+
+    Returns:
+        dict: Status, queries run, rows read and full table scans
+    """
+    from django.db import connections
+    from django.test.utils import CaptureQueriesContext
+
+    with ExitStack() as stack:
+        captures = [
+            stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in connections
+        ]
+        response = getattr(client, method)(path, data)
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+
+    queries = rows = scans = 0
+    rows_known = scans_known = False
+    for capture in captures:
+        queries += len(capture)
+        for query in capture.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                continue
+            read, full_scans = explain(capture.connection, sql)
+            if read is not None:
+                rows, rows_known = rows + read, True
+            if full_scans is not None:
+                scans, scans_known = scans + full_scans, True
+    return {
+        'status': response.status_code,
+        'queries': queries,
+        'rows_read': rows if rows_known else None,
+        'full_scans': scans if scans_known else None,
+    }
+
+
+def run_scenario(client, method, path, data, iterations, warmup,
+                 warm_cache):
+    """
+    Time one scenario.
+
+    Returns:
+        dict: Latency statistics (ms) and the profile of one request
+    """
+    from django.core.cache import caches
+
+    def clear():
+        if not warm_cache:
+            for cache in caches.all():
+                cache.clear()
+
+    for _ in range(warmup):
+        clear()
+        getattr(client, method)(path, data)
+
+    latencies = []
+    errors = 0
+    for _ in range(iterations):
+        clear()
+        start = time.perf_counter()
+        response = getattr(client, method)(path, data)
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+        latencies.append(time.perf_counter() - start)
+        errors += response.status_code >= 400
+
+    clear()
+    result = profile(client, method, path, data)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': iterations,
+        'errors': errors,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'p50_ms': round(quantiles[49] * 1000, 3),
+        'p95_ms': round(quantiles[94] * 1000, 3),
+        'p99_ms': round(quantiles[98] * 1000, 3),
+        **result,
+    }
+
+
+def search_terms():
+    """Return a frequent and a rare word of generated notes."""
+    from sticky_notes_app.management.commands.generate_notes import (
+        RARE_WORDS, VOCABULARY
+    )
+    # The most frequent words are stop words to some search backends
+    return VOCABULARY[10], RARE_WORDS[0]
+
+
+def git_revision():
+    """Return the current commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """
+    Print each scenario's change against a baseline.
+
+    Returns:
+        bool: True if any scenario regressed
+    """
+    regressed = False
+    print(f"\n{'scenario':<18}{'base p95':>10}{'p95':>10}{'change':>9}"
+          f"{'queries':>10}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        change = (result['p95_ms'] / base['p95_ms'] - 1
+                  if base['p95_ms'] else 0)
+        worse = (change > threshold
+                 or result['queries'] > base['queries'])
+        regressed |= worse
+        print(f"{name:<18}{base['p95_ms']:>10}{result['p95_ms']:>10}"
+              f"{change:>+9.0%}{base['queries']:>5} ->{result['queries']:>3}"
+              f"{'  REGRESSION' if worse else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--notes', type=int, default=0,
+                        help='Minimum number of notes; generated if missing')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS,
+                        help='Timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=WARMUP,
+                        help='Untimed requests per scenario')
+    parser.add_argument('--deep-page', type=int, default=DEEP_PAGE,
+                        help='Page number of the deep-page scenario')
+    parser.add_argument('--warm-cache', action='store_true',
+                        help='Keep the caches between requests')
+    parser.add_argument('--scenarios', nargs='+',
+                        help='Scenarios to run (default: all)')
+    parser.add_argument('--output', help='File to save the results to')
+    parser.add_argument('--compare', help='Results file to compare against')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='Tolerated p95 growth for --compare')
+    args = parser.parse_args()
+    if args.iterations < 2:
+        parser.error('--iterations must be at least 2.')
+
+    setup_django()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+    from sticky_notes_app.models import Note
+
+    missing = args.notes - Note.objects.count()
+    if missing > 0:
+        call_command('generate_notes', missing, seed=Note.objects.count())
+    note_id = Note.objects.active().values_list('pk', flat=True).first()
+    if note_id is None:
+        parser.error('The database has no active notes; use --notes.')
+
+    all_scenarios = scenarios(note_id, *search_terms(), args.deep_page)
+    names = args.scenarios or list(all_scenarios)
+    unknown = sorted(set(names) - set(all_scenarios))
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}; expected "
+                     f"{', '.join(all_scenarios)}.")
+
+    client = Client(SERVER_NAME='127.0.0.1')
+    results = {}
+    for name in names:
+        method, path, data = all_scenarios[name]
+        results[name] = run_scenario(
+            client, method, path, data, args.iterations, args.warmup,
+            args.warm_cache,
+        )
+        row = results[name]
+        print(f"{name:<18} p50 {row['p50_ms']:>9} ms  p95 {row['p95_ms']:>9}"
+              f" ms  p99 {row['p99_ms']:>9} ms  {row['queries']:>3} queries"
+              f"  rows {row['rows_read']}  scans {row['full_scans']}"
+              f"  errors {row['errors']}")
+    if 'archive_toggle' in results and (
+            args.warmup + args.iterations + 1) % 2:
+        # The note was toggled an odd number of times; restore it
+        client.post(all_scenarios['archive_toggle'][1])
+
+    report = {
+        'meta': {
+            'notes': Note.objects.count(),
+            'active_notes': Note.objects.active().count(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'revision': git_revision(),
+            'iterations': args.iterations,
+            'warm_cache': args.warm_cache,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline:
+            baseline = json.load(baseline)
+        if baseline['meta'].get('notes') != report['meta']['notes']:
+            print(f"\nNote: the baseline ran on {baseline['meta'].get('notes')}"
+                  f" notes, this run on {report['meta']['notes']}.")
+        if compare(results, baseline['results'], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
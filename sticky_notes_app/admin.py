@@ -4,10 +4,340 @@ Admin configuration for sticky_notes_app.
 This module contains Django admin configurations for the sticky notes
 application, providing a comprehensive admin interface for managing notes
 with filtering, searching, and bulk operations.
+
+With the STICKY_NOTES_ADMIN_LARGE_DATASET setting the note changelist
+avoids the queries that scan the whole table: pages are counted from the
+NoteCount counters or estimated, the date hierarchy's range and buckets
+are cached, search goes through the full-text search backend, and the
+category, priority and archive filters show counts from the counters.
+
+Saving the changelist's editable column does not save each changed note
+on its own: the changes are grouped by their new values and written with
+one UPDATE per group, and the admin log entries with one INSERT per
+change message.
 """
 
-from django.contrib import admin
-from .models import Note
+import json
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.options import ShowFacets
+from django.contrib.admin.views.main import (
+    ERROR_FLAG, IGNORED_PARAMS, PAGE_VAR, SEARCH_VAR
+)
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import router, transaction
+from django.db.models import Max, Min
+from django.forms.models import BaseModelFormSet
+from django.utils import timezone
+from .bulk import BulkActionError, apply_bulk_action
+from .caching import get_cached_dates, invalidate_note_pages
+from .counts import counters_available, estimate_count, exact_count
+from .events import publish_note_event
+from .models import Note, NoteCount, NoteQuerySet
+from .pagination import EstimatedPaginator
+from .search import IContainsSearchBackend, get_search_backend
+
+# Changelist filter parameters answered by the NoteCount counters, mapped
+# to the counter field they filter
+COUNTED_FILTERS = {
+    'category__exact': 'category',
+    'priority__exact': 'priority',
+    'is_archived__exact': 'is_archived',
+}
+
+# Changelist parameters that do not filter the notes
+NON_FILTER_PARAMS = set(IGNORED_PARAMS) | {PAGE_VAR, ERROR_FLAG}
+
+
+def large_dataset_mode():
+    """Check whether the admin runs in its large-dataset mode."""
+    return getattr(settings, 'STICKY_NOTES_ADMIN_LARGE_DATASET', False)
+
+
+def counted_filters(params):
+    """
+    Translate changelist filters into NoteCount lookups.
+
+    Args:
+        params (dict): Changelist query parameters
+
+    Returns:
+        dict: Counter field to value, or None if a search or another
+        filter needs the note table
+    """
+    if params.get(SEARCH_VAR):
+        return None
+    filters = {}
+    for name, value in params.items():
+        if name in NON_FILTER_PARAMS:
+            continue
+        if name not in COUNTED_FILTERS:
+            return None
+        field = COUNTED_FILTERS[name]
+        if field == 'is_archived':
+            if value not in ('0', '1'):
+                return None
+            value = value == '1'
+        filters[field] = value
+    return filters
+
+
+class NoteAdminPaginator(EstimatedPaginator):
+    """
+    Paginator of the large-dataset changelist, over a given count.
+
+    Unlike EstimatedPaginator its pages hold querysets, which the
+    changelist's list_editable formset needs.
+    """
+
+    def page(self, number):
+        """Return a page; page numbers beyond the count are allowed."""
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
+
+
+class CachedDatesQuerySet(NoteQuerySet):
+    """
+    Note queryset caching the queries of the admin date hierarchy.
+
+    The date hierarchy reads the range of the dates (Min and Max) and the
+    distinct years, months or days of the changelist's notes; each of
+    these scans every matching note, so their results are cached.
+    """
+
+    def _cached(self, label, compute):
+        """Cache the result of a query on this queryset."""
+        try:
+            sql, params = self.query.sql_with_params()
+        except EmptyResultSet:
+            return compute()
+        return get_cached_dates(f'{label}:{sql}:{params!r}', compute)
+
+    def aggregate(self, *args, **kwargs):
+        """Aggregate, caching date ranges (Min and Max only)."""
+        if args or not kwargs or not all(
+            isinstance(value, (Min, Max)) for value in kwargs.values()
+        ):
+            return super().aggregate(*args, **kwargs)
+        label = repr(sorted((name, repr(value))
+                            for name, value in kwargs.items()))
+        return self._cached(
+            label, lambda: super(CachedDatesQuerySet, self).aggregate(**kwargs)
+        )
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None):
+        """Return the distinct datetimes of a kind, as a cached list."""
+        return self._cached(
+            f'datetimes:{field_name}:{kind}:{order}:{tzinfo}',
+            lambda: list(super(CachedDatesQuerySet, self).datetimes(
+                field_name, kind, order, tzinfo
+            ))
+        )
+
+    def dates(self, field_name, kind, order='ASC'):
+        """Return the distinct dates of a kind, as a cached list."""
+        return self._cached(
+            f'dates:{field_name}:{kind}:{order}',
+            lambda: list(super(CachedDatesQuerySet, self).dates(
+                field_name, kind, order
+            ))
+        )
+
+
+class CountedFilterMixin:
+    """
+    List filter labelling its choices with counts from NoteCount.
+
+    The counts take the other counter-backed filters into account. They
+    are left out when a search or another filter is active, since the
+    counters cannot answer those.
+    """
+
+    def choice_counts(self, changelist):
+        """
+        Count the notes of each value of the filtered field.
+
+        Returns:
+            dict: Field value to count, or None if counts are unavailable
+        """
+        params = dict(changelist.params)
+        params.pop(self.lookup_kwarg, None)
+        filters = counted_filters(params)
+        if filters is None or not counters_available(
+                changelist.queryset.db):
+            return None
+        if not hasattr(changelist, 'note_buckets'):
+            # One read of the counter table serves every filter
+            changelist.note_buckets = list(
+                NoteCount.objects.using(changelist.queryset.db).filter(
+                    count__gt=0
+                ).values('is_archived', 'category', 'priority', 'count')
+            )
+        counts = {}
+        for bucket in changelist.note_buckets:
+            if all(bucket[name] == value for name, value in filters.items()):
+                value = bucket[self.field.name]
+                counts[value] = counts.get(value, 0) + bucket['count']
+        return counts
+
+    def choices(self, changelist):
+        """Yield the choices, with counts after the field's values."""
+        counts = self.choice_counts(changelist)
+        choices = super().choices(changelist)
+        # "All" comes first, then one choice per value, in order
+        yield next(choices)
+        for value, choice in zip(self.choice_values(), choices):
+            if counts is not None:
+                choice['display'] = (
+                    f"{choice['display']} ({counts.get(value, 0):,})"
+                )
+            yield choice
+
+
+class CountedChoicesFieldListFilter(CountedFilterMixin,
+                                    admin.ChoicesFieldListFilter):
+    """Choices filter (category, priority) with counter-backed counts."""
+
+    def choice_values(self):
+        """Return the field values of the choices, in order."""
+        return [value for value, _ in self.field.flatchoices]
+
+
+class CountedBooleanFieldListFilter(CountedFilterMixin,
+                                    admin.BooleanFieldListFilter):
+    """Yes/No filter (archived) with counter-backed counts."""
+
+    def choice_values(self):
+        """Return the field values of the choices, in order."""
+        return [True, False]
+
+
+class LoadedNoteChoiceField(forms.ModelChoiceField):
+    """
+    Primary key field of a changelist row.
+
+    ModelChoiceField runs a query per row to check the submitted id; this
+    field looks the id up among the notes its formset already read.
+    """
+
+    def __init__(self, formset, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.formset = formset
+
+    def to_python(self, value):
+        """Return the formset's note with the submitted id."""
+        if value in self.empty_values:
+            return None
+        try:
+            pk = Note._meta.pk.to_python(value)
+        except ValidationError:
+            pk = None
+        note = self.formset._existing_object(pk) if pk is not None else None
+        if note is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice'
+            )
+        return note
+
+
+class NoteChangelistFormSet(BaseModelFormSet):
+    """Changelist formset checking its rows' ids without a query per row."""
+
+    def add_fields(self, form, index):
+        """Add the formset's fields, with a LoadedNoteChoiceField for ids."""
+        super().add_fields(form, index)
+        name = self._pk_field.name
+        field = form.fields[name]
+        form.fields[name] = LoadedNoteChoiceField(
+            self, field.queryset, initial=field.initial, required=False,
+            widget=field.widget,
+        )
+
+
+class ListEditableBatch:
+    """
+    Changes made by one save of the changelist's editable columns.
+
+    NoteAdmin collects the changed notes and their log messages here
+    instead of saving and logging each note, then writes them all with
+    flush().
+
+    Attributes:
+        fields (tuple): Names of the editable fields
+        notes (dict): New field values to the notes changed to them
+        messages (dict): Change message to the notes it describes
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.notes = {}
+        self.messages = {}
+
+    def add(self, note):
+        """Record a changed note, grouped by its new values."""
+        values = tuple(getattr(note, name) for name in self.fields)
+        self.notes.setdefault(values, []).append(note)
+
+    def log(self, note, message):
+        """Record the change message of a note."""
+        key = json.dumps(message) if isinstance(message, list) else message
+        self.messages.setdefault(key, []).append(note)
+
+    def flush(self, user_id, using):
+        """
+        Write the recorded changes and their log entries.
+
+        Args:
+            user_id (int): The user who made the changes
+            using (str): Database alias to write to
+
+        Returns:
+            int: Number of notes updated
+        """
+        now = timezone.now()
+        affected = 0
+        for values, notes in self.notes.items():
+            affected += Note.objects.using(using).filter(
+                pk__in=[note.pk for note in notes]
+            ).update(updated_at=now, **dict(zip(self.fields, values)))
+            for note in notes:
+                note.updated_at = now
+        for message, notes in self.messages.items():
+            LogEntry.objects.db_manager(using).log_actions(
+                user_id=user_id, queryset=notes, action_flag=CHANGE,
+                change_message=message,
+            )
+        if affected:
+            # Queryset updates send no post_save signal
+            invalidate_note_pages()
+            publish_note_event('bulk', action='edit', affected=affected)
+        return affected
+
+
+class NoteActionForm(ActionForm):
+    """
+    Admin action form with the values used by the bulk change actions.
+
+    Attributes:
+        category: New category for the "set category" action
+        priority: New priority for the "set priority" action
+    """
+
+    category = forms.ChoiceField(
+        choices=[('', 'Category...')] + Note.CATEGORY_CHOICES,
+        required=False
+    )
+    priority = forms.ChoiceField(
+        choices=[('', 'Priority...')] + Note.PRIORITY_CHOICES,
+        required=False
+    )
 
 
 @admin.register(Note)
@@ -29,6 +359,9 @@ class NoteAdmin(admin.ModelAdmin):
         list_per_page: Number of items per page in the list view
         date_hierarchy: Field to use for date-based navigation
         ordering: Default ordering for the admin list view
+        actions: Bulk actions applied with chunked UPDATE/DELETE statements
+        action_form: Action form carrying the new category or priority
+        large_list_filter: Filters of the large-dataset mode
     """
 
     # Fields to display in the admin list view
@@ -74,12 +407,206 @@ class NoteAdmin(admin.ModelAdmin):
     # Default ordering for the admin list view
     ordering = ('-updated_at',)
 
+    # Bulk actions and the form carrying their values
+    actions = ('archive_notes', 'unarchive_notes', 'set_category',
+               'set_priority', 'delete_notes')
+    action_form = NoteActionForm
+
+    # Filters of the large-dataset mode, with counts from the counters
+    large_list_filter = (
+        ('category', CountedChoicesFieldListFilter),
+        ('priority', CountedChoicesFieldListFilter),
+        ('is_archived', CountedBooleanFieldListFilter),
+        'created_at', 'updated_at',
+    )
+
+    @property
+    def show_full_result_count(self):
+        """Count the unfiltered notes for "N of M" unless the table is large."""
+        return not large_dataset_mode()
+
+    @property
+    def show_facets(self):
+        """Never offer facet counts (a COUNT per choice) on large tables."""
+        return ShowFacets.NEVER if large_dataset_mode() else ShowFacets.ALLOW
+
+    def get_list_filter(self, request):
+        """Use the counter-backed filters in the large-dataset mode."""
+        if large_dataset_mode():
+            return self.large_list_filter
+        return super().get_list_filter(request)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        """
+        Paginate without counting every note in the large-dataset mode.
+
+        The count comes from the NoteCount counters when only the
+        category, priority and archive filters are active, and is
+        estimated otherwise.
+        """
+        if not large_dataset_mode():
+            return super().get_paginator(
+                request, queryset, per_page, orphans, allow_empty_first_page
+            )
+        filters = counted_filters(request.GET.dict())
+        if filters is not None:
+            count = exact_count(using=queryset.db, **{
+                'is_archived': None, **filters
+            })
+            exact = True
+        else:
+            count, exact = estimate_count(queryset)
+        return NoteAdminPaginator(
+            queryset, per_page, count, exact=exact, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search with the full-text backend in the large-dataset mode.
+
+        Without a full-text index the search falls back to a prefix match
+        on the title rather than a substring match on the content.
+
+        Returns:
+            tuple: (queryset, may_have_duplicates)
+        """
+        if not large_dataset_mode() or not search_term.strip():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        backend = get_search_backend(queryset.db)
+        if isinstance(backend, IContainsSearchBackend):
+            return queryset.filter(
+                title__istartswith=search_term.strip()
+            ), False
+        return backend.search(queryset, search_term, ranked=False), False
+
+    def changelist_view(self, request, extra_context=None):
+        """
+        Show the changelist, batching the saves of its editable columns.
+
+        When the editable columns are saved, save_model() and log_change()
+        record the changed notes in a ListEditableBatch, which is written
+        once the changelist has processed every row, in the same
+        transaction.
+        """
+        if request.method != 'POST' or '_save' not in request.POST:
+            return super().changelist_view(request, extra_context)
+        using = router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            request.note_edit_batch = batch = ListEditableBatch(
+                self.list_editable
+            )
+            try:
+                response = super().changelist_view(request, extra_context)
+            finally:
+                del request.note_edit_batch
+            batch.flush(request.user.pk, using)
+        return response
+
+    def get_changelist_formset(self, request, **kwargs):
+        """Return the changelist formset, without a query per row."""
+        kwargs.setdefault('formset', NoteChangelistFormSet)
+        return super().get_changelist_formset(request, **kwargs)
+
+    def save_model(self, request, obj, form, change):
+        """Save a note, or record it while the changelist is saved."""
+        batch = getattr(request, 'note_edit_batch', None)
+        if batch is not None and change:
+            batch.add(obj)
+            return
+        super().save_model(request, obj, form, change)
+
+    def log_change(self, request, obj, message):
+        """Log a change, or record it while the changelist is saved."""
+        batch = getattr(request, 'note_edit_batch', None)
+        if batch is not None:
+            batch.log(obj, message)
+            return None
+        return super().log_change(request, obj, message)
+
+    def run_bulk_action(self, request, queryset, action, value=None):
+        """
+        Apply a bulk action to the selected notes and report the result.
+
+        Args:
+            request: The HTTP request object
+            queryset: The selected notes
+            action (str): Bulk action name
+            value (str): New category or priority, if the action needs one
+        """
+        try:
+            affected = apply_bulk_action(action, value, queryset=queryset)
+        except BulkActionError as exc:
+            self.message_user(request, str(exc), messages.ERROR)
+            return
+        verb = 'deleted' if action == 'delete' else 'updated'
+        self.message_user(
+            request, f"{affected} note(s) {verb}.", messages.SUCCESS
+        )
+
+    @admin.action(description="Archive selected notes",
+                  permissions=['change'])
+    def archive_notes(self, request, queryset):
+        """Archive the selected notes."""
+        self.run_bulk_action(request, queryset, 'archive')
+
+    @admin.action(description="Unarchive selected notes",
+                  permissions=['change'])
+    def unarchive_notes(self, request, queryset):
+        """Unarchive the selected notes."""
+        self.run_bulk_action(request, queryset, 'unarchive')
+
+    @admin.action(description="Set category of selected notes",
+                  permissions=['change'])
+    def set_category(self, request, queryset):
+        """Set the selected notes to the category chosen in the form."""
+        self.run_bulk_action(
+            request, queryset, 'set_category', request.POST.get('category')
+        )
+
+    @admin.action(description="Set priority of selected notes",
+                  permissions=['change'])
+    def set_priority(self, request, queryset):
+        """Set the selected notes to the priority chosen in the form."""
+        self.run_bulk_action(
+            request, queryset, 'set_priority', request.POST.get('priority')
+        )
+
+    @admin.action(description="Delete selected notes",
+                  permissions=['delete'])
+    def delete_notes(self, request, queryset):
+        """Delete the selected notes in chunks, without loading them."""
+        self.run_bulk_action(request, queryset, 'delete')
+
+    def get_actions(self, request):
+        """
+        Replace the site-wide delete action with delete_notes.
+
+        Django's delete_selected lists every selected note on its
+        confirmation page and loads them all again to send the delete
+        signals; it would also share delete_notes' label.
+
+        Args:
+            request: The HTTP request object
+
+        Returns:
+            dict: The actions available to the user
+        """
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
     def get_queryset(self, request):
         """
         Customize the queryset for the admin list view.
         
         This method allows showing all notes including archived ones in the admin,
         providing full administrative control over the note collection.
+        In the large-dataset mode the queryset caches the date hierarchy
+        queries.
         
         Args:
             request: The HTTP request object
@@ -87,7 +614,13 @@ class NoteAdmin(admin.ModelAdmin):
         Returns:
             QuerySet: The queryset to use in the admin interface
         """
-        return super().get_queryset(request)
+        queryset = super().get_queryset(request)
+        if large_dataset_mode():
+            queryset = CachedDatesQuerySet(
+                model=queryset.model, query=queryset.query.chain(),
+                using=queryset._db, hints=queryset._hints,
+            )
+        return queryset
 
     def get_list_display(self, request):
         """
@@ -0,0 +1,627 @@
+"""
+JSON API views for the sticky_notes_app.
+
+This module contains the JSON endpoints used by scripts and other
+non-browser clients. Every POST, PUT and PATCH must be sent as
+``application/json``, even without a body; since browsers cannot send that
+content type across sites without a CORS preflight, these endpoints are
+exempt from the CSRF token check that the HTML forms use.
+
+Reads are open, like the HTML pages. Every write needs a user, logged in
+or sent with HTTP Basic credentials, holding the matching model
+permission: "add note" to create, "delete note" to delete and "change
+note" for any other change.
+
+Read endpoints accept ``?fields=`` to select the serialized fields and
+answer conditional requests: the ETag and Last-Modified headers are
+derived from ``updated_at`` with a single cheap query, so an unchanged
+note or page is answered with 304 Not Modified before any note is loaded
+or serialized.
+
+The styles endpoint describes the label and badge CSS class of every
+category and priority, from the same StyleMap lookups the templates use,
+so clients can render notes as the HTML pages do.
+
+The export endpoint streams every matching note as CSV or JSON Lines and,
+unlike the other read endpoints, requires the view_note permission.
+"""
+
+import base64
+import binascii
+import json
+
+from django.contrib.auth import authenticate
+from django.core.handlers.asgi import ASGIRequest
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import require_http_methods
+
+from .bulk import BulkActionError, apply_bulk_action
+from .conditional import (
+    filter_state, make_etag, not_modified, set_validators
+)
+from .export import (
+    EXPORT_FORMATS, NoteExport, aiter_chunks, encode_chunks, gzip_chunks
+)
+from .forms import NoteForm, NoteSearchForm
+from .models import CATEGORY_STYLES, PRIORITY_STYLES, Note
+from .pagination import CursorPaginator, InvalidCursor
+from .signals import note_archive_toggled
+
+# Fields a client may request with ?fields=, in serialization order
+API_FIELDS = (
+    'id', 'title', 'content', 'category', 'priority', 'is_archived',
+    'created_at', 'updated_at',
+)
+
+# Notes per page of the list endpoint, unless ?limit= asks for fewer
+API_PAGE_SIZE = 50
+
+# Largest page a client may request with ?limit=
+API_MAX_PAGE_SIZE = 200
+
+
+def json_error(message, status=400, errors=None):
+    """
+    Build a JSON error response.
+
+    Args:
+        message (str): Human-readable error message
+        status (int): HTTP status code
+        errors (dict): Optional per-field validation errors
+
+    Returns:
+        JsonResponse: ``{"error": message}`` with the given status
+    """
+    body = {'error': message}
+    if errors is not None:
+        body['errors'] = errors
+    return JsonResponse(body, status=status)
+
+
+def parse_json_body(request):
+    """
+    Decode the JSON object in a request body.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        tuple: (data, error_response); exactly one of them is None
+    """
+    if request.content_type != 'application/json':
+        return None, json_error("Expected application/json.", status=415)
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None, json_error("Invalid JSON.")
+    if not isinstance(data, dict):
+        return None, json_error("Expected a JSON object.")
+    return data, None
+
+
+def filtered_notes(filters):
+    """
+    Build a note queryset from a filter expression.
+
+    The filter uses the NoteSearchForm fields plus an optional
+    ``is_archived`` boolean; without it both archived and active notes
+    are included.
+
+    Args:
+        filters (dict): Filter expression
+
+    Returns:
+        tuple: (queryset, error_message); exactly one of them is None
+    """
+    form = NoteSearchForm(filters)
+    if not form.is_valid():
+        return None, f"Invalid filters: {form.errors.as_text()}"
+
+    notes = Note.objects.all()
+    is_archived = filters.get('is_archived')
+    if is_archived is not None:
+        if not isinstance(is_archived, bool):
+            return None, "is_archived must be true or false."
+        notes = notes.filter(is_archived=is_archived)
+
+    notes = notes.apply_filters(
+        search_query=form.cleaned_data.get('search_query'),
+        category=form.cleaned_data.get('category_filter'),
+        priority=form.cleaned_data.get('priority_filter'),
+        ranked=False,
+    )
+    return notes, None
+
+
+@csrf_exempt
+@require_POST
+def note_bulk(request):
+    """
+    Apply one action to many notes.
+
+    The JSON body holds an ``action`` (archive, unarchive, delete,
+    set_category or set_priority), a ``value`` for the set_* actions, and
+    the selection: either ``ids``, a list of note ids, or ``filters``, a
+    non-empty filter expression (see filtered_notes()).
+
+    The user, logged in or sent with Basic auth, needs the "delete note"
+    permission to delete and the "change note" permission otherwise.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: The action and the number of notes affected
+    """
+    data, error = parse_json_body(request)
+    if error:
+        return error
+    action = data.get('action')
+    error = permission_error(
+        request, 'delete_note' if action == 'delete' else 'change_note'
+    )
+    if error:
+        return error
+
+    ids = data.get('ids')
+    filters = data.get('filters')
+    queryset = None
+    if ids is not None:
+        if not isinstance(ids, list) or not all(
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in ids
+        ):
+            return json_error("ids must be a list of integers.")
+    elif isinstance(filters, dict) and filters:
+        queryset, message = filtered_notes(filters)
+        if message:
+            return json_error(message)
+    else:
+        return json_error("Select notes with ids or a non-empty filters.")
+
+    try:
+        affected = apply_bulk_action(
+            action, value=data.get('value'), ids=ids, queryset=queryset
+        )
+    except BulkActionError as exc:
+        return json_error(str(exc))
+
+    return JsonResponse({'action': action, 'affected': affected})
+
+
+def parse_fields(request):
+    """
+    Read the sparse fieldset requested with ``?fields=``.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        tuple: (fields, error_message); exactly one of them is None
+    """
+    requested = request.GET.get('fields')
+    if not requested:
+        return API_FIELDS, None
+    fields = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = sorted(set(fields) - set(API_FIELDS))
+    if unknown or not fields:
+        return None, f"Unknown fields: {', '.join(unknown) or requested!r}."
+    # Keep the canonical order so equal fieldsets share an ETag
+    return tuple(name for name in API_FIELDS if name in fields), None
+
+
+def serialize_note(note, fields=API_FIELDS):
+    """
+    Convert a note to a JSON-serializable dict.
+
+    Args:
+        note (Note): The note to serialize
+        fields (tuple): Names from API_FIELDS to include
+
+    Returns:
+        dict: Field name to value; datetimes are left to JsonResponse
+    """
+    return {name: getattr(note, name) for name in fields}
+
+
+def load_fields(fields):
+    """Return the model fields to load for a fieldset, for only()."""
+    # updated_at is always needed for cursors and validators
+    return set(fields) | {'id', 'updated_at'}
+
+
+def note_response(note, status=200):
+    """
+    Serialize a whole note with its validators.
+
+    Args:
+        note (Note): The note to return
+        status (int): HTTP status code
+
+    Returns:
+        JsonResponse: The note with ETag and Last-Modified headers
+    """
+    response = JsonResponse(serialize_note(note), status=status)
+    return set_validators(
+        response, make_etag(note.pk, note.updated_at, API_FIELDS),
+        note.updated_at
+    )
+
+
+def list_filters(request):
+    """
+    Build the filter expression of a list request.
+
+    Active notes are listed unless ``?archived=true`` (archived notes only)
+    or ``?archived=all`` is given.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        tuple: (filters, error_message); exactly one of them is None
+    """
+    filters = {
+        name: request.GET[name]
+        for name in NoteSearchForm.base_fields if name in request.GET
+    }
+    archived = request.GET.get('archived', 'false')
+    if archived not in ('true', 'false', 'all'):
+        return None, "archived must be true, false or all."
+    if archived != 'all':
+        filters['is_archived'] = archived == 'true'
+    return filters, None
+
+
+def page_url(request, **params):
+    """Return the request's URL with some query parameters replaced."""
+    query = request.GET.copy()
+    for name, value in params.items():
+        query[name] = value
+    return f'{request.path}?{query.urlencode()}'
+
+
+def list_notes(request):
+    """
+    Return one cursor page of notes as JSON.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: ``results`` plus ``next`` and ``previous`` page URLs
+    """
+    fields, message = parse_fields(request)
+    if message:
+        return json_error(message)
+    filters, message = list_filters(request)
+    if message:
+        return json_error(message)
+    notes, message = filtered_notes(filters)
+    if message:
+        return json_error(message)
+
+    try:
+        limit = int(request.GET.get('limit', API_PAGE_SIZE))
+    except ValueError:
+        return json_error("limit must be an integer.")
+    if not 1 <= limit <= API_MAX_PAGE_SIZE:
+        return json_error(f"limit must be between 1 and {API_MAX_PAGE_SIZE}.")
+
+    last_modified, count = filter_state(
+        is_archived=filters.get('is_archived'),
+        category=filters.get('category_filter', ''),
+        priority=filters.get('priority_filter', ''),
+    )
+    etag = make_etag(last_modified, count, sorted(request.GET.lists()))
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    paginator = CursorPaginator(notes.only(*load_fields(fields)), limit)
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return json_error("Invalid cursor.")
+
+    response = JsonResponse({
+        'results': [serialize_note(note, fields) for note in page],
+        'next': (page_url(request, cursor=page.next_cursor)
+                 if page.has_next() else None),
+        'previous': (page_url(request, cursor=page.previous_cursor)
+                     if page.has_previous() else None),
+    })
+    return set_validators(response, etag, last_modified)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'HEAD', 'POST'])
+def note_collection(request):
+    """
+    List notes or create a note.
+
+    GET returns a page of notes filtered with the search form fields
+    (``search_query``, ``category_filter``, ``priority_filter``) and
+    ``archived``; ``limit`` sets the page size and ``cursor`` selects a
+    page. POST creates a note from a JSON object with the NoteForm fields
+    and needs the "add note" permission.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: The page of notes, or the created note (201)
+    """
+    if request.method != 'POST':
+        return list_notes(request)
+
+    data, error = parse_json_body(request)
+    if error:
+        return error
+    error = permission_error(request, 'add_note')
+    if error:
+        return error
+    form = NoteForm(data)
+    if not form.is_valid():
+        return json_error("Invalid note.", errors=form.errors.get_json_data())
+    note = form.save()
+    response = note_response(note, status=201)
+    response.headers['Location'] = reverse(
+        'sticky_notes_app:api_note_detail', args=[note.pk]
+    )
+    return response
+
+
+@require_GET
+def note_search_api(request):
+    """
+    Search notes.
+
+    This is the list endpoint with a required ``search_query``; it
+    accepts the same filters, fields and pagination parameters.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: A page of matching notes
+    """
+    if not request.GET.get('search_query', '').strip():
+        return json_error("search_query is required.")
+    return list_notes(request)
+
+
+@require_GET
+def note_styles(request):
+    """
+    Describe the categories and priorities.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: ``category`` and ``priority``, each mapping values to
+        their ``label`` and ``css_class``
+    """
+    return JsonResponse({
+        'category': CATEGORY_STYLES.as_dict(),
+        'priority': PRIORITY_STYLES.as_dict(),
+    })
+
+
+def note_state(pk):
+    """Return the updated_at of a note, or None if it does not exist."""
+    return Note.objects.filter(pk=pk).values_list(
+        'updated_at', flat=True
+    ).first()
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'HEAD', 'PUT', 'PATCH', 'DELETE'])
+def note_resource(request, pk):
+    """
+    Read, update or delete a single note.
+
+    GET answers If-None-Match and If-Modified-Since from the note's
+    updated_at alone, before the note is loaded. PUT replaces every
+    NoteForm field, PATCH only the fields present in the body, and DELETE
+    removes the note. Updates need the "change note" permission and
+    deletes the "delete note" permission.
+
+    Args:
+        request: The HTTP request object
+        pk (int): Primary key of the note
+
+    Returns:
+        JsonResponse: The note, 304 Not Modified, or 204 after a delete
+    """
+    if request.method in ('GET', 'HEAD'):
+        fields, message = parse_fields(request)
+        if message:
+            return json_error(message)
+        updated_at = note_state(pk)
+        if updated_at is None:
+            return json_error("Note not found.", status=404)
+
+        etag = make_etag(pk, updated_at, fields)
+        response = not_modified(request, etag, updated_at)
+        if response is not None:
+            return response
+        note = Note.objects.only(*load_fields(fields)).filter(pk=pk).first()
+        if note is None:
+            return json_error("Note not found.", status=404)
+        # Validators of the row actually serialized, in case it changed
+        return set_validators(
+            JsonResponse(serialize_note(note, fields)),
+            make_etag(pk, note.updated_at, fields), note.updated_at
+        )
+
+    if request.method == 'DELETE':
+        error = permission_error(request, 'delete_note')
+        if error:
+            return error
+        note = Note.objects.filter(pk=pk).first()
+        if note is None:
+            return json_error("Note not found.", status=404)
+        note.delete()
+        return HttpResponse(status=204)
+
+    data, error = parse_json_body(request)
+    if error:
+        return error
+    error = permission_error(request, 'change_note')
+    if error:
+        return error
+    note = Note.objects.filter(pk=pk).first()
+    if note is None:
+        return json_error("Note not found.", status=404)
+    if request.method == 'PATCH':
+        data = {**model_to_dict(note, fields=NoteForm._meta.fields), **data}
+    form = NoteForm(data, instance=note)
+    if not form.is_valid():
+        return json_error("Invalid note.", errors=form.errors.get_json_data())
+    return note_response(form.save())
+
+
+@csrf_exempt
+@require_POST
+def note_archive_api(request, pk):
+    """
+    Toggle the archive status of a note.
+
+    The request has no body but must still be sent as
+    ``application/json``, so a cross-site form cannot submit it, and needs
+    the "change note" permission.
+
+    Args:
+        request: The HTTP request object
+        pk (int): Primary key of the note
+
+    Returns:
+        JsonResponse: The note id and its new archive status
+    """
+    _, error = parse_json_body(request)
+    if error:
+        return error
+    error = permission_error(request, 'change_note')
+    if error:
+        return error
+    is_archived = Note.objects.toggle_archived(pk)
+    if is_archived is None:
+        return json_error("Note not found.", status=404)
+    # A queryset update sends no post_save signal
+    note_archive_toggled(pk, is_archived)
+    return JsonResponse({'id': pk, 'is_archived': is_archived})
+
+
+def request_user(request):
+    """
+    Return the user of a request, logged in or sent with Basic auth.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        User: The authenticated user, or None
+    """
+    if request.user.is_authenticated:
+        return request.user
+    scheme, _, credentials = request.headers.get(
+        'Authorization', ''
+    ).partition(' ')
+    if scheme.lower() != 'basic':
+        return None
+    try:
+        decoded = base64.b64decode(credentials, validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    username, _, password = decoded.partition(':')
+    return authenticate(request, username=username, password=password)
+
+
+def authentication_required():
+    """
+    Build the response asking a client to authenticate.
+
+    Returns:
+        JsonResponse: 401 Unauthorized, offering Basic auth
+    """
+    response = json_error("Authentication required.", status=401)
+    response.headers['WWW-Authenticate'] = 'Basic realm="notes"'
+    return response
+
+
+def permission_error(request, permission):
+    """
+    Check that the user of a request holds a note permission.
+
+    Args:
+        request: The HTTP request object
+        permission (str): Codename of the permission, e.g. "change_note"
+
+    Returns:
+        JsonResponse: 401 or 403 if the request may not proceed, else None
+    """
+    user = request_user(request)
+    if user is None:
+        return authentication_required()
+    if not user.has_perm(f'sticky_notes_app.{permission}'):
+        return json_error("Permission denied.", status=403)
+    return None
+
+
+@require_GET
+def note_export(request):
+    """
+    Stream the notes matching the list filters as a file.
+
+    Accepts the list endpoint's filters and ``?fields=``, plus
+    ``?format=`` (csv, jsonl or ndjson) and ``?gzip=1`` to compress the
+    file as it is sent. Notes are read and sent a chunk at a time, so
+    memory use does not grow with the number of notes.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        StreamingHttpResponse: The export, as an attachment
+    """
+    error = permission_error(request, 'view_note')
+    if error:
+        return error
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return json_error(
+            f"format must be one of {', '.join(EXPORT_FORMATS)}."
+        )
+    fields, message = parse_fields(request)
+    if message:
+        return json_error(message)
+    filters, message = list_filters(request)
+    if message:
+        return json_error(message)
+    notes, message = filtered_notes(filters)
+    if message:
+        return json_error(message)
+
+    # Read every chunk from the database chosen now, for this request
+    export = NoteExport(notes.using(notes.db), fields, export_format)
+    chunks = encode_chunks(export)
+    content_type = export.content_type
+    filename = f'notes.{export_format}'
+    if request.GET.get('gzip') == '1':
+        chunks = gzip_chunks(chunks)
+        content_type = 'application/gzip'
+        filename += '.gz'
+    if isinstance(request, ASGIRequest):
+        chunks = aiter_chunks(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename="{filename}"'
+    )
+    return response
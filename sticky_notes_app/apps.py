@@ -25,4 +25,11 @@ class StickyNotesAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     
     # The full Python path to the application
-    name = 'sticky_notes_app'
\ No newline at end of file
+    name = 'sticky_notes_app'
+
+    def ready(self):
+        """
+        Connect the app's signal handlers and register its system checks
+        once the app registry is ready.
+        """
+        from . import checks, signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""
+URL configuration for sticky_notes_app under ASGI.
+
+The same paths and names as urls.py, with the list, detail, archive and
+search pages served by their async views. The project serves these
+patterns when the STICKY_NOTES_ASYNC_VIEWS setting is on, which asgi.py
+does by default.
+"""
+
+from . import async_views
+# app_name gives these patterns the same namespace as urls.py
+from .urls import app_name, note_urlpatterns  # noqa: F401
+
+# URL patterns for the sticky notes application, with the async views
+urlpatterns = note_urlpatterns(
+    async_views.note_list,
+    async_views.note_detail,
+    async_views.note_archive,
+    async_views.note_search,
+)
@@ -0,0 +1,374 @@
+"""
+Async views for the sticky_notes_app.
+
+This module contains async versions of the note list, detail, search and
+archive views for ASGI deployments. Under an ASGI server, the synchronous
+views in views.py each run in a worker thread; these views run on the
+event loop instead, reading notes with the async ORM (``aget``,
+``aaggregate``, async iteration) and leaving the loop only for the parts
+of Django that are still synchronous: the cache layer, which is entered
+through sync_to_async, and template rendering, which is pure CPU work
+once the context is loaded.
+
+They render the same templates and produce the same pages as their
+synchronous counterparts, including conditional GET, the list page cache
+and streamed search results. With the STICKY_NOTES_ASYNC_VIEWS setting
+(on by default in asgi.py) they are served under the synchronous views'
+paths and URL names; see async_urls.py.
+
+The live note event stream is only available here, since each open stream
+would hold a whole worker of a synchronous server.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.core.handlers.asgi import ASGIRequest
+from django.db import router
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET, require_POST
+
+from .caching import cache_page_content, get_cached_page, render_note_cards
+from .conditional import (
+    alist_state, make_etag, not_modified, set_validators
+)
+from .counts import acount_notes, afacet_counts
+from .events import event_stream, note_event_broker
+from .forms import NoteSearchForm
+from .models import Note
+from .pagination import apaginate_notes, uses_cursor_pagination
+from .routers import reads_may_be_stale
+from .search import get_search_backend
+from .signals import note_archive_toggled
+from .views import NOTES_PER_PAGE, STREAM_CHUNK_SIZE, render_stream_page
+
+
+async def load_request_state(request):
+    """
+    Load the session (and with it the flash messages) asynchronously.
+
+    Templates read the messages synchronously; once the session is
+    loaded here they no longer need a query for it.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        bool: True if flash messages are pending
+    """
+    await request.session.aitems()
+    return bool(len(messages.get_messages(request)))
+
+
+async def filtered_notes(filters, ranked):
+    """
+    Build the queryset of active notes matching the filters.
+
+    Args:
+        filters (dict): ``search_query``, ``category`` and ``priority``
+        ranked (bool): Whether to order search results by relevance
+
+    Returns:
+        QuerySet: The filtered notes, loaded for cards
+    """
+    if filters.get('search_query'):
+        # Picking the backend may inspect the database the request reads
+        # from, once per process and alias
+        await sync_to_async(get_search_backend)(router.db_for_read(Note))
+    return Note.objects.active().for_cards().apply_filters(
+        ranked=ranked, **filters
+    )
+
+
+async def render_notes_page(request, template_name, notes, filters,
+                            context):
+    """
+    Paginate notes and render them with the sidebar facets.
+
+    Args:
+        request: The HTTP request object
+        template_name (str): Template of the page
+        notes (QuerySet): The filtered notes
+        filters (dict): ``search_query``, ``category`` and ``priority``
+        context (dict): Extra template context
+
+    Returns:
+        HttpResponse: The rendered page
+
+    Raises:
+        Http404: If the page number or cursor is invalid
+    """
+    count, exact = await acount_notes(notes, **filters)
+    paginator, page, object_list, is_paginated = await apaginate_notes(
+        request, notes, NOTES_PER_PAGE, count, exact=exact
+    )
+    facets = await afacet_counts(**filters)
+    note_cards = await sync_to_async(render_note_cards)(object_list)
+
+    context.update({
+        'notes': object_list,
+        'note_cards': note_cards,
+        'note_total': count,
+        'note_total_exact': exact,
+        'paginator': paginator,
+        'page_obj': page,
+        'is_paginated': is_paginated,
+        'categories': Note.CATEGORY_CHOICES,
+        'priorities': Note.PRIORITY_CHOICES,
+        'category_facets': facets['categories'],
+        'priority_facets': facets['priorities'],
+        'cursor_pagination': uses_cursor_pagination(request),
+    })
+    return render(request, template_name, context)
+
+
+@require_GET
+async def note_list(request):
+    """
+    Display the active notes with search and filter parameters.
+
+    This is the async version of NoteListView, answering conditional
+    requests from the same validators and sharing its page cache.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        HttpResponse: 304 Not Modified, or the cached or freshly
+        rendered note list
+    """
+    has_messages = await load_request_state(request)
+    if not has_messages:
+        key, page = await sync_to_async(get_cached_page)(request)
+        if page is not None:
+            etag, last_modified = page['etag'], page['last_modified']
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = set_validators(
+                    HttpResponse(page['content']), etag, last_modified
+                )
+            return response
+
+    filters = {
+        'search_query': request.GET.get('search_query', ''),
+        'category': request.GET.get('category_filter', ''),
+        'priority': request.GET.get('priority_filter', ''),
+    }
+
+    last_modified, count, facet_state = await alist_state(
+        category=filters['category'], priority=filters['priority']
+    )
+    etag = make_etag(
+        'note_list', last_modified, count, facet_state,
+        sorted(request.GET.lists())
+    )
+    if not has_messages:
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+    notes = await filtered_notes(
+        filters, ranked=not uses_cursor_pagination(request)
+    )
+    response = await render_notes_page(
+        request, 'sticky_notes_app/note_list.html', notes, filters,
+        {'search_form': NoteSearchForm(request.GET)}
+    )
+    # Pages rendered with flash messages are never cached
+    if not has_messages and not await sync_to_async(reads_may_be_stale)():
+        await sync_to_async(cache_page_content)(
+            key, response.content, etag, last_modified
+        )
+    return set_validators(response, etag, last_modified)
+
+
+@require_GET
+async def note_detail(request, pk):
+    """
+    Display a single active note.
+
+    This is the async version of NoteDetailView. Only the note's
+    updated_at is read to answer conditional requests.
+
+    Args:
+        request: The HTTP request object
+        pk (int): Primary key of the note
+
+    Returns:
+        HttpResponse: 304 Not Modified, or the rendered note
+
+    Raises:
+        Http404: If the note does not exist or is archived
+    """
+    has_messages = await load_request_state(request)
+    notes = Note.objects.active()
+
+    if not has_messages:
+        updated_at = await notes.filter(pk=pk).values_list(
+            'updated_at', flat=True
+        ).afirst()
+        if updated_at is None:
+            raise Http404("No note found matching the query.")
+        response = not_modified(
+            request, make_etag('note_detail', pk, updated_at), updated_at
+        )
+        if response is not None:
+            return response
+
+    try:
+        note = await notes.aget(pk=pk)
+    except Note.DoesNotExist:
+        raise Http404("No note found matching the query.")
+
+    response = render(request, 'sticky_notes_app/note_detail.html',
+                      {'note': note, 'object': note})
+    return set_validators(
+        response, make_etag('note_detail', note.pk, note.updated_at),
+        note.updated_at
+    )
+
+
+@require_GET
+async def note_search(request):
+    """
+    Search and filter notes.
+
+    This is the async version of note_search; with ``stream=1`` every
+    match is streamed, read with the async ORM.
+
+    Args:
+        request: The HTTP request object containing search parameters
+
+    Returns:
+        HttpResponse: Rendered search results page
+    """
+    await load_request_state(request)
+    form = NoteSearchForm(request.GET)
+
+    filters = {}
+    if form.is_valid():
+        filters = {
+            'search_query': form.cleaned_data.get('search_query'),
+            'category': form.cleaned_data.get('category_filter'),
+            'priority': form.cleaned_data.get('priority_filter'),
+        }
+    notes = await filtered_notes(
+        filters, ranked=not uses_cursor_pagination(request)
+    )
+    if request.GET.get('stream') == '1':
+        facets = await afacet_counts(**filters)
+        return stream_search_results(request, notes, {
+            'search_form': form,
+            'categories': Note.CATEGORY_CHOICES,
+            'priorities': Note.PRIORITY_CHOICES,
+            'category_facets': facets['categories'],
+            'priority_facets': facets['priorities'],
+            'cursor_pagination': uses_cursor_pagination(request),
+        })
+    return await render_notes_page(
+        request, 'sticky_notes_app/search_results.html', notes, filters,
+        {'search_form': form}
+    )
+
+
+def stream_search_results(request, notes, context):
+    """
+    Stream every search result as rendered note cards.
+
+    This is the async version of views.stream_search_results(): the rows
+    are read with the async ORM while the page is sent.
+
+    Args:
+        request: The HTTP request object
+        notes (QuerySet): The filtered notes to stream
+        context (dict): Template context for the surrounding page
+
+    Returns:
+        StreamingHttpResponse: The streamed results page
+    """
+    head, tail = render_stream_page(request, context)
+    # Rows are read after the view returns; keep the request's database
+    notes = notes.using(notes.db)
+
+    async def render_cards(chunk):
+        return ''.join(await sync_to_async(render_note_cards)(chunk))
+
+    async def render_page():
+        yield head
+        chunk = []
+        found = False
+        async for note in notes.aiterator(chunk_size=STREAM_CHUNK_SIZE):
+            chunk.append(note)
+            if len(chunk) == STREAM_CHUNK_SIZE:
+                yield await render_cards(chunk)
+                chunk, found = [], True
+        if chunk:
+            yield await render_cards(chunk)
+        elif not found:
+            yield render_to_string('sticky_notes_app/search_empty.html')
+        yield tail
+
+    return StreamingHttpResponse(render_page())
+
+
+@require_POST
+async def note_archive(request, pk):
+    """
+    Toggle the archive status of a note.
+
+    This is the async version of note_archive.
+
+    Args:
+        request: The HTTP request object
+        pk (int): Primary key of the note to archive/unarchive
+
+    Returns:
+        HttpResponseRedirect: Redirect to the note list page
+
+    Raises:
+        Http404: If the note does not exist
+    """
+    await load_request_state(request)
+    is_archived = await Note.objects.atoggle_archived(pk)
+    if is_archived is None:
+        raise Http404("No note found matching the query.")
+    # A queryset update sends no post_save signal
+    await sync_to_async(note_archive_toggled)(pk, is_archived)
+
+    action = "archived" if is_archived else "not archived"
+    messages.success(request, f'Note {action} successfully!')
+
+    return redirect('sticky_notes_app:note_list')
+
+
+@require_GET
+async def note_events(request):
+    """
+    Stream live note events to the browser as Server-Sent Events.
+
+    A reconnecting browser sends the ID of the last event it received in
+    the Last-Event-ID header and is sent the events it missed first.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        StreamingHttpResponse: The ``text/event-stream`` of note events,
+        or 204 No Content when not served over ASGI
+    """
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server would buffer the endless stream; 204 tells the
+        # browser's EventSource not to reconnect.
+        return HttpResponse(status=204)
+
+    subscription = note_event_broker.subscribe(
+        request.headers.get('Last-Event-ID')
+    )
+    response = StreamingHttpResponse(
+        event_stream(subscription), content_type='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,134 @@
+"""
+Bulk operations for the sticky_notes_app.
+
+This module applies one action (archive, unarchive, delete, or a category
+or priority change) to many notes at once. Notes are processed in chunks
+of primary keys, each chunk being a single UPDATE or DELETE statement
+that commits on its own, so very large selections never hold one long
+lock.
+"""
+
+from django.db import router
+from django.utils import timezone
+
+from .caching import invalidate_note_pages
+from .events import publish_note_event
+from .models import Note
+
+# Maximum number of notes changed by one UPDATE or DELETE statement
+BULK_CHUNK_SIZE = 1000
+
+# Supported actions mapped to the field they change, if any
+BULK_ACTIONS = {
+    'archive': 'is_archived',
+    'unarchive': 'is_archived',
+    'delete': None,
+    'set_category': 'category',
+    'set_priority': 'priority',
+}
+
+
+class BulkActionError(ValueError):
+    """Raised when a bulk action or its value is invalid."""
+
+
+def _changes_for(action, value):
+    """
+    Return the field values a bulk action writes.
+
+    Args:
+        action (str): One of BULK_ACTIONS
+        value (str): Category or priority for the set_* actions
+
+    Returns:
+        dict: Field name to new value, or None for deletion
+
+    Raises:
+        BulkActionError: If the action or value is invalid
+    """
+    if action not in BULK_ACTIONS:
+        raise BulkActionError(f"Unknown action: {action!r}")
+    if action == 'delete':
+        return None
+    if action in ('archive', 'unarchive'):
+        return {'is_archived': action == 'archive'}
+
+    field_name = BULK_ACTIONS[action]
+    choices = dict(Note._meta.get_field(field_name).choices)
+    if value not in choices:
+        raise BulkActionError(f"Invalid {field_name}: {value!r}")
+    return {field_name: value}
+
+
+def _pk_chunks(queryset, chunk_size):
+    """
+    Yield the primary keys of a queryset in ascending chunks.
+
+    Each chunk is read with a keyset query on the primary key, so the cost
+    of a chunk does not depend on how many were read before it.
+    """
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        chunk_query = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+        chunk = list(chunk_query[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+def _id_chunks(ids, chunk_size):
+    """Yield a list of primary keys in chunks of at most chunk_size."""
+    ids = sorted(set(ids))
+    for start in range(0, len(ids), chunk_size):
+        yield ids[start:start + chunk_size]
+
+
+def apply_bulk_action(action, value=None, ids=None, queryset=None,
+                      chunk_size=BULK_CHUNK_SIZE):
+    """
+    Apply an action to a selection of notes.
+
+    The selection is either a list of ids, which is chunked directly, or a
+    queryset, whose primary keys are read chunk by chunk. Rows that already
+    have the target value are skipped, so the returned count only includes
+    notes that actually changed. Updates also set updated_at.
+
+    Args:
+        action (str): One of BULK_ACTIONS
+        value (str): Category or priority for the set_* actions
+        ids (list): Primary keys of the notes to change
+        queryset (QuerySet): Notes to change, used when ids is None
+        chunk_size (int): Maximum notes per UPDATE or DELETE
+
+    Returns:
+        int: Number of notes changed or deleted
+
+    Raises:
+        BulkActionError: If the action or value is invalid
+    """
+    changes = _changes_for(action, value)
+    if ids is not None:
+        chunks = _id_chunks(ids, chunk_size)
+    else:
+        chunks = _pk_chunks(queryset, chunk_size)
+
+    affected = 0
+    for chunk in chunks:
+        batch = Note.objects.filter(pk__in=chunk)
+        if changes is None:
+            # QuerySet.delete() would load every note to send the delete
+            # signals; a raw delete is one statement. batch.db is the
+            # read database, so the primary is asked for explicitly.
+            affected += batch._raw_delete(router.db_for_write(Note))
+        else:
+            affected += batch.exclude(**changes).update(
+                updated_at=timezone.now(), **changes
+            )
+
+    if affected:
+        invalidate_note_pages()
+        # One event for the whole action; clients reload rather than patch
+        publish_note_event('bulk', action=action, affected=affected)
+    return affected
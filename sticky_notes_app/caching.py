@@ -0,0 +1,360 @@
+"""
+Caching helpers for the sticky_notes_app.
+
+This module contains the fragment cache for rendered note cards, the
+page cache for the note list and the cache of facet counts, together with
+the hit/miss counters used to monitor them.
+
+Card fragments are keyed on ``(pk, updated_at)``, so editing a note
+produces a new key and stale cards simply expire. Cached list pages are
+keyed on the request's query string plus a generation number that is
+bumped whenever a note changes, which invalidates every cached page at
+once. Facet counts use the same generation. The admin's date hierarchy
+queries are keyed on their SQL and simply expire.
+
+The generation only invalidates pages across processes if they share the
+page cache, so page and facet caching can be turned off with the
+STICKY_NOTES_PAGE_CACHING setting (off by default with per-process LocMem
+caches in production; see checks.py).
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+# Seconds a rendered note card is kept
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Seconds a rendered list page is kept
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Seconds the facet counts of a search are kept
+FACET_CACHE_TIMEOUT = 60 * 5
+
+# Seconds the admin's date hierarchy ranges and buckets are kept
+DATE_CACHE_TIMEOUT = 60 * 10
+
+# Cache key prefix shared by every key this module writes
+KEY_PREFIX = 'sticky_notes'
+
+# Names of the caches reported by get_cache_stats()
+STAT_NAMES = ('card', 'page', 'facet', 'dates')
+
+CARD_TEMPLATE = 'sticky_notes_app/note_card.html'
+
+
+def get_card_cache():
+    """Return the cache holding rendered note cards."""
+    return caches[getattr(settings, 'STICKY_NOTES_CARD_CACHE', 'default')]
+
+
+def get_page_cache():
+    """Return the cache holding rendered list pages."""
+    return caches[getattr(settings, 'STICKY_NOTES_PAGE_CACHE', 'default')]
+
+
+def get_stats_cache():
+    """Return the cache holding the hit/miss counters."""
+    return caches[getattr(settings, 'STICKY_NOTES_STATS_CACHE', 'default')]
+
+
+def get_count_cache():
+    """Return the cache holding facet counts and admin date queries."""
+    return caches[getattr(settings, 'STICKY_NOTES_COUNT_CACHE', 'default')]
+
+
+def page_caching_enabled():
+    """Return whether list pages and facet counts are cached."""
+    return getattr(settings, 'STICKY_NOTES_PAGE_CACHING', True)
+
+
+def _increment(cache, key, delta=1):
+    """Increment a counter, creating it if it does not exist yet."""
+    if cache.add(key, delta, timeout=None):
+        return delta
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # The key expired or was evicted between add() and incr()
+        cache.set(key, delta, timeout=None)
+        return delta
+
+
+def record_cache_access(name, hits=0, misses=0):
+    """
+    Add to the hit and miss counters of a cache.
+
+    Args:
+        name (str): One of STAT_NAMES
+        hits (int): Number of hits to record
+        misses (int): Number of misses to record
+    """
+    cache = get_stats_cache()
+    if hits:
+        _increment(cache, f'{KEY_PREFIX}:stats:{name}:hits', hits)
+    if misses:
+        _increment(cache, f'{KEY_PREFIX}:stats:{name}:misses', misses)
+
+
+def get_cache_stats():
+    """
+    Return the hit and miss counters of the note caches.
+
+    Returns:
+        dict: ``{name: {'hits': int, 'misses': int}}`` for each cache
+    """
+    cache = get_stats_cache()
+    stats = {}
+    for name in STAT_NAMES:
+        counters = cache.get_many([
+            f'{KEY_PREFIX}:stats:{name}:hits',
+            f'{KEY_PREFIX}:stats:{name}:misses',
+        ])
+        stats[name] = {
+            'hits': counters.get(f'{KEY_PREFIX}:stats:{name}:hits', 0),
+            'misses': counters.get(f'{KEY_PREFIX}:stats:{name}:misses', 0),
+        }
+    return stats
+
+
+def card_cache_key(note):
+    """
+    Build the fragment cache key of a note card.
+
+    Args:
+        note (Note): The note the card renders
+
+    Returns:
+        str: Key derived from the note's pk and updated_at
+    """
+    stamp = int(note.updated_at.timestamp() * 1000000)
+    return f'{KEY_PREFIX}:card:{note.pk}:{stamp}'
+
+
+def render_note_cards(notes):
+    """
+    Render note cards, reusing cached fragments where possible.
+
+    All cards are looked up with a single get_many() call and the misses
+    are stored with a single set_many() call.
+
+    Args:
+        notes: Iterable of notes loaded with NoteQuerySet.for_cards()
+
+    Returns:
+        list: Rendered card HTML, in the same order as notes
+    """
+    notes = list(notes)
+    cache = get_card_cache()
+    keys = [card_cache_key(note) for note in notes]
+    cached = cache.get_many(keys)
+
+    missing = {}
+    template = None
+    cards = []
+    for note, key in zip(notes, keys):
+        card = cached.get(key)
+        if card is None:
+            template = template or get_template(CARD_TEMPLATE)
+            card = missing[key] = template.render({'note': note})
+        cards.append(mark_safe(card))
+
+    if missing:
+        cache.set_many(missing, CARD_CACHE_TIMEOUT)
+    record_cache_access(
+        'card', hits=len(notes) - len(missing), misses=len(missing)
+    )
+    return cards
+
+
+def delete_note_card(note):
+    """Remove the cached card of a note, if any."""
+    get_card_cache().delete(card_cache_key(note))
+
+
+def _page_generation():
+    """
+    Return the current generation number of cached list pages.
+
+    A missing generation (first use, or evicted) restarts from the current
+    time so it can never match the generation of pages still in the cache.
+    """
+    cache = get_page_cache()
+    key = f'{KEY_PREFIX}:page:generation'
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def page_cache_key(request):
+    """
+    Build the cache key of a list page.
+
+    Args:
+        request: The HTTP request for the page
+
+    Returns:
+        str: Key derived from the path, query string and generation
+    """
+    params = sorted(request.GET.lists())
+    digest = hashlib.md5(
+        repr((request.path, params)).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'{KEY_PREFIX}:page:{_page_generation()}:{digest}'
+
+
+def get_cached_page(request):
+    """
+    Look up the cached content of a list page.
+
+    The key is returned with the content so a page rendered after a miss
+    is stored under the generation that was current when it was read, not
+    one bumped while it was being rendered.
+
+    Args:
+        request: The HTTP request for the page
+
+    Returns:
+        tuple: (key, page), where page is a dict with the ``content``,
+        ``etag`` and ``last_modified`` of the page, or None on a miss;
+        both are None when page caching is off
+    """
+    if not page_caching_enabled():
+        return None, None
+    key = page_cache_key(request)
+    page = get_page_cache().get(key)
+    if page is None:
+        record_cache_access('page', misses=1)
+    else:
+        record_cache_access('page', hits=1)
+    return key, page
+
+
+def cache_page_content(key, content, etag=None, last_modified=None):
+    """
+    Store the rendered content of a list page.
+
+    The page's validators are stored with it, so conditional requests for
+    a cached page can be answered without a query. They stay valid as
+    long as the entry does, since any note change invalidates both.
+
+    Args:
+        key (str): Key returned by get_cached_page(); None stores nothing
+        content (bytes): The rendered page content
+        etag (str): ETag of the page, if any
+        last_modified (datetime): Last-Modified of the page, if any
+    """
+    if key is None:
+        return
+    page = {
+        'content': content,
+        'etag': etag,
+        'last_modified': last_modified,
+    }
+    get_page_cache().set(key, page, PAGE_CACHE_TIMEOUT)
+
+
+def facet_cache_key(search_query):
+    """
+    Build the cache key of the facet counts of a search.
+
+    Args:
+        search_query (str): Free-text query, or '' for all notes
+
+    Returns:
+        str: Key derived from the query and the page generation
+    """
+    digest = hashlib.md5(
+        search_query.encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'{KEY_PREFIX}:facets:{_page_generation()}:{digest}'
+
+
+def get_cached_facets(search_query, compute, store=True):
+    """
+    Return the facet counts of a search, computing them on a miss.
+
+    Args:
+        search_query (str): Free-text query, or '' for all notes
+        compute (callable): Called without arguments to build the counts
+        store (bool): Whether freshly computed counts are cached
+
+    Returns:
+        The cached or freshly computed counts
+    """
+    if not page_caching_enabled():
+        return compute()
+    cache = get_count_cache()
+    key = facet_cache_key(search_query)
+    counts = cache.get(key)
+    if counts is None:
+        record_cache_access('facet', misses=1)
+        counts = compute()
+        if store:
+            cache.set(key, counts, FACET_CACHE_TIMEOUT)
+    else:
+        record_cache_access('facet', hits=1)
+    return counts
+
+
+def get_cached_dates(query, compute):
+    """
+    Return the result of a date query, computing it on a miss.
+
+    The result is not invalidated when notes change: a new year, month or
+    day appears in the admin's date hierarchy within DATE_CACHE_TIMEOUT.
+
+    Args:
+        query (str): The query's SQL and parameters, identifying it
+        compute (callable): Called without arguments to run the query
+
+    Returns:
+        The cached or freshly computed result
+    """
+    cache = get_count_cache()
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    key = f'{KEY_PREFIX}:dates:{digest}'
+    result = cache.get(key)
+    if result is None:
+        record_cache_access('dates', misses=1)
+        result = compute()
+        cache.set(key, result, DATE_CACHE_TIMEOUT)
+    else:
+        record_cache_access('dates', hits=1)
+    return result
+
+
+def seconds_since_note_change():
+    """
+    Return the time since invalidate_note_pages() was last called.
+
+    Returns:
+        float: Seconds since notes last changed, or None if unknown
+    """
+    changed_at = get_page_cache().get(f'{KEY_PREFIX}:page:changed_at')
+    if changed_at is None:
+        return None
+    return time.time() - changed_at
+
+
+def invalidate_note_pages():
+    """
+    Invalidate every cached list page and facet count.
+
+    Bumping the generation changes all page and facet keys; the old
+    entries are never read again and expire on their own. The time of
+    the change is recorded for seconds_since_note_change().
+    """
+    cache = get_page_cache()
+    key = f'{KEY_PREFIX}:page:generation'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+    cache.set(f'{KEY_PREFIX}:page:changed_at', time.time(), timeout=None)
@@ -0,0 +1,57 @@
+"""
+System checks for the sticky_notes_app.
+
+This module contains the checks run by ``manage.py check`` and at server
+start. They report configurations that work in development but break
+once several worker processes serve the app.
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Cache backend that keeps its entries inside each process
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches)
+def check_page_cache(app_configs, **kwargs):
+    """
+    Warn when list pages are cached in per-process memory.
+
+    Cached list pages and facet counts are invalidated by a generation
+    number in the page cache. With a LocMem cache every worker has its
+    own generation, so a note changed through one worker leaves the
+    others serving stale pages (and 304 responses) until they expire.
+    DEBUG and the test runner use a single process and are not reported.
+
+    Args:
+        app_configs: Apps to check, or None for all apps
+        **kwargs: Additional keyword arguments
+
+    Returns:
+        list: A sticky_notes_app.W001 warning per LocMem cache, if any
+    """
+    if settings.DEBUG or getattr(settings, 'TESTING', False):
+        return []
+    if not getattr(settings, 'STICKY_NOTES_PAGE_CACHING', True):
+        return []
+
+    warnings = []
+    aliases = {
+        getattr(settings, 'STICKY_NOTES_PAGE_CACHE', 'default'),
+        getattr(settings, 'STICKY_NOTES_COUNT_CACHE', 'default'),
+    }
+    for alias in sorted(aliases):
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend == LOCMEM_BACKEND:
+            warnings.append(Warning(
+                f"Page caching uses the per-process LocMem cache "
+                f"{alias!r}.",
+                hint=(
+                    "Notes changed in one worker are not invalidated in "
+                    "the others. Set CACHE_BACKEND to 'file' or 'redis', "
+                    "or turn page caching off with PAGE_CACHE=False."
+                ),
+                id='sticky_notes_app.W001',
+            ))
+    return warnings
@@ -0,0 +1,173 @@
+"""
+Conditional GET helpers for the sticky_notes_app.
+
+This module builds the ETag and Last-Modified validators of note pages and
+API responses from ``Note.updated_at``, and answers If-None-Match and
+If-Modified-Since requests with 304 Not Modified. The validators are
+computed from lightweight queries (a row's updated_at, or the
+MAX(updated_at) of the filtered notes plus their count from the NoteCount
+rows), so an unchanged page is answered before any note is loaded or any
+template rendered.
+"""
+
+import hashlib
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .counts import aexact_count, exact_count
+from .models import Note
+
+
+def make_etag(*parts):
+    """
+    Build a quoted ETag from the parts identifying a representation.
+
+    Args:
+        *parts: Values that change whenever the representation does
+
+    Returns:
+        str: Quoted strong ETag
+    """
+    digest = hashlib.md5(
+        repr(parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def filter_state(is_archived=False, category='', priority=''):
+    """
+    Return the validators state of the notes matching sidebar filters.
+
+    Any change to these notes moves their newest updated_at (edits,
+    archiving, new notes) or their count (deletes and notes leaving the
+    selection), so together they identify every page filtered by them,
+    including searches within them. The newest updated_at comes from an
+    index and the count from the NoteCount rows, so no notes are scanned.
+
+    Args:
+        is_archived (bool): Archive status of the notes, or None for both
+        category (str): Category value the notes are filtered by
+        priority (str): Priority value the notes are filtered by
+
+    Returns:
+        tuple: (last_modified, count); last_modified is None if empty
+    """
+    notes = _filtered_notes(is_archived, category, priority)
+    last_modified = notes.aggregate(
+        last_modified=Max('updated_at')
+    )['last_modified']
+    return last_modified, exact_count(is_archived, category, priority)
+
+
+async def afilter_state(is_archived=False, category='', priority=''):
+    """
+    Async version of filter_state().
+
+    Returns:
+        tuple: (last_modified, count); last_modified is None if empty
+    """
+    notes = _filtered_notes(is_archived, category, priority)
+    last_modified = (await notes.aaggregate(
+        last_modified=Max('updated_at')
+    ))['last_modified']
+    count = await aexact_count(is_archived, category, priority)
+    return last_modified, count
+
+
+def list_state(category='', priority=''):
+    """
+    Return the validators state of a note list page.
+
+    The page lists the active notes matching its sidebar filters, but its
+    facet counts cover every active note, so a filtered page also changes
+    with notes outside its selection. For a filtered page the state of all
+    active notes is added; their newest updated_at, never older than that
+    of the selection, is the page's last modification.
+
+    Args:
+        category (str): Category value the notes are filtered by
+        priority (str): Priority value the notes are filtered by
+
+    Returns:
+        tuple: (last_modified, count, facet_state); count is that of the
+        selected notes, facet_state the state of all active notes, or
+        None when the page is not filtered
+    """
+    last_modified, count = filter_state(category=category, priority=priority)
+    if not (category or priority):
+        return last_modified, count, None
+    facet_state = filter_state()
+    return facet_state[0], count, facet_state
+
+
+async def alist_state(category='', priority=''):
+    """
+    Async version of list_state().
+
+    Returns:
+        tuple: (last_modified, count, facet_state)
+    """
+    last_modified, count = await afilter_state(
+        category=category, priority=priority
+    )
+    if not (category or priority):
+        return last_modified, count, None
+    facet_state = await afilter_state()
+    return facet_state[0], count, facet_state
+
+
+def _filtered_notes(is_archived, category, priority):
+    """Select the notes matching the archive and sidebar filters."""
+    notes = Note.objects.order_by()
+    if is_archived is not None:
+        notes = notes.filter(is_archived=is_archived)
+    return notes.apply_filters(category=category, priority=priority)
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Add the ETag and Last-Modified headers to a response.
+
+    The response is also marked ``no-cache``, so browsers revalidate it on
+    every visit instead of guessing a freshness lifetime from
+    Last-Modified.
+
+    Args:
+        response (HttpResponse): The response to update
+        etag (str): Quoted ETag of the representation
+        last_modified (datetime): Last modification time, or None
+
+    Returns:
+        HttpResponse: The same response
+    """
+    response.headers['ETag'] = etag
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(
+            last_modified.timestamp()
+        )
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Answer a conditional request from its validators, if possible.
+
+    Args:
+        request: The HTTP request object
+        etag (str): Quoted ETag of the current representation
+        last_modified (datetime): Last modification time, or None
+
+    Returns:
+        HttpResponse: 304 Not Modified (or 412 for a failed
+        precondition), or None if the representation must be built
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
@@ -0,0 +1,287 @@
+"""
+Note counts for the sticky_notes_app.
+
+This module counts notes without scanning the note table. Filters on the
+archive flag, category and priority are answered exactly from the
+NoteCount rows maintained by database triggers. Free-text searches cannot
+be answered from counters; their counts are estimated instead: small
+result sets are counted up to ESTIMATE_CAP rows, and larger ones use the
+PostgreSQL planner's row estimate where it is available.
+
+facet_counts() builds the per-category and per-priority counts shown in
+the filter sidebar from one grouped query, cached per search.
+
+Functions prefixed with ``a`` are the async versions used by the async
+views.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import connections, router
+from django.db.models import Count, Sum
+
+from .caching import get_cached_facets
+from .models import Note, NoteCount
+from .routers import reads_may_be_stale
+
+# Backends whose migrations install the NoteCount triggers
+COUNTED_VENDORS = ('sqlite', 'postgresql')
+
+# Rows counted exactly before a search count becomes an estimate
+ESTIMATE_CAP = 1000
+
+
+def counters_available(using='default'):
+    """
+    Check whether the NoteCount rows are maintained on a database.
+
+    Args:
+        using (str): Database alias
+
+    Returns:
+        bool: True if the counter triggers exist on this backend
+    """
+    return connections[using].vendor in COUNTED_VENDORS
+
+
+def _bucket_filters(is_archived, category, priority):
+    """Build the field lookups selecting notes or counter rows."""
+    filters = {}
+    if is_archived is not None:
+        filters['is_archived'] = is_archived
+    if category:
+        filters['category'] = category
+    if priority:
+        filters['priority'] = priority
+    return filters
+
+
+def exact_count(is_archived=False, category='', priority='', using=None):
+    """
+    Count the notes matching archive, category and priority filters.
+
+    Empty values leave the corresponding filter out, and ``is_archived``
+    None counts archived and active notes alike. Backends without counter
+    triggers fall back to a COUNT query on the note table.
+
+    Args:
+        is_archived (bool): Archive status to count, or None for both
+        category (str): Category value to filter by
+        priority (str): Priority value to filter by
+        using (str): Database alias; the router's read database by default
+
+    Returns:
+        int: Exact number of matching notes
+    """
+    using = using or router.db_for_read(NoteCount)
+    filters = _bucket_filters(is_archived, category, priority)
+    if not counters_available(using):
+        return Note.objects.using(using).filter(**filters).count()
+    total = NoteCount.objects.using(using).filter(**filters).aggregate(
+        total=Sum('count')
+    )['total']
+    return total or 0
+
+
+async def aexact_count(is_archived=False, category='', priority='',
+                       using=None):
+    """
+    Async version of exact_count().
+
+    Returns:
+        int: Exact number of matching notes
+    """
+    using = using or router.db_for_read(NoteCount)
+    filters = _bucket_filters(is_archived, category, priority)
+    if not counters_available(using):
+        return await Note.objects.using(using).filter(**filters).acount()
+    total = (await NoteCount.objects.using(using).filter(
+        **filters
+    ).aaggregate(total=Sum('count')))['total']
+    return total or 0
+
+
+def planner_estimate(queryset):
+    """
+    Return the PostgreSQL planner's row estimate for a queryset.
+
+    Args:
+        queryset (QuerySet): The query to estimate
+
+    Returns:
+        int: Estimated number of rows
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_count(queryset, cap=None):
+    """
+    Count a queryset, estimating once it exceeds a cap.
+
+    At most ``cap + 1`` rows are counted. Beyond that the count is the
+    planner's estimate on PostgreSQL (never less than the cap) and the cap
+    itself elsewhere.
+
+    Args:
+        queryset (QuerySet): The notes to count
+        cap (int): Number of rows counted exactly; ESTIMATE_CAP by default
+
+    Returns:
+        tuple: (count, exact), where exact is False for an estimate
+    """
+    if cap is None:
+        cap = ESTIMATE_CAP
+    queryset = queryset.order_by()
+    count = queryset[:cap + 1].count()
+    if count <= cap:
+        return count, True
+    if connections[queryset.db].vendor == 'postgresql':
+        return max(planner_estimate(queryset), cap), False
+    return cap, False
+
+
+async def aestimate_count(queryset, cap=None):
+    """
+    Async version of estimate_count().
+
+    Returns:
+        tuple: (count, exact), where exact is False for an estimate
+    """
+    if cap is None:
+        cap = ESTIMATE_CAP
+    queryset = queryset.order_by()
+    count = await queryset[:cap + 1].acount()
+    if count <= cap:
+        return count, True
+    if connections[queryset.db].vendor == 'postgresql':
+        estimate = await sync_to_async(planner_estimate)(queryset)
+        return max(estimate, cap), False
+    return cap, False
+
+
+def count_notes(queryset, search_query='', category='', priority='',
+                is_archived=False):
+    """
+    Count filtered notes without scanning them where possible.
+
+    Args:
+        queryset (QuerySet): The filtered notes, used for searches
+        search_query (str): Free-text query the notes are filtered by
+        category (str): Category value the notes are filtered by
+        priority (str): Priority value the notes are filtered by
+        is_archived (bool): Archive status, or None for both
+
+    Returns:
+        tuple: (count, exact); searches may return an estimate
+    """
+    if search_query:
+        return estimate_count(queryset)
+    count = exact_count(is_archived, category, priority, using=queryset.db)
+    return count, True
+
+
+async def acount_notes(queryset, search_query='', category='', priority='',
+                       is_archived=False):
+    """
+    Async version of count_notes().
+
+    Returns:
+        tuple: (count, exact); searches may return an estimate
+    """
+    if search_query:
+        return await aestimate_count(queryset)
+    count = await aexact_count(
+        is_archived, category, priority, using=queryset.db
+    )
+    return count, True
+
+
+def bucket_counts(search_query='', using=None):
+    """
+    Count active notes per (category, priority) combination.
+
+    Without a search the counts are the NoteCount rows; a search runs a
+    single grouped aggregate over the matching notes.
+
+    Args:
+        search_query (str): Free-text query, or '' for all active notes
+        using (str): Database alias; the router's read database by default
+
+    Returns:
+        list: ``(category, priority, count)`` tuples of non-empty buckets
+    """
+    using = using or router.db_for_read(NoteCount)
+    if not search_query and counters_available(using):
+        rows = NoteCount.objects.using(using).filter(
+            is_archived=False, count__gt=0
+        ).values_list('category', 'priority', 'count')
+        return list(rows)
+
+    notes = Note.objects.using(using).active()
+    if search_query:
+        notes = notes.search(search_query, ranked=False)
+    rows = notes.order_by().values('category', 'priority').annotate(
+        total=Count('pk')
+    ).values_list('category', 'priority', 'total')
+    return list(rows)
+
+
+def facet_counts(search_query='', category='', priority=''):
+    """
+    Count the results each sidebar filter option would give.
+
+    Each facet applies the search and the other facet's selection but not
+    its own, so every option shows how many notes selecting it would
+    return. Both facets come from the same cached bucket_counts() rows.
+
+    Args:
+        search_query (str): Free-text query the notes are filtered by
+        category (str): Selected category, or ''
+        priority (str): Selected priority, or ''
+
+    Returns:
+        dict: ``categories`` and ``priorities``, each a list of
+        ``(value, label, count)`` tuples in choice order
+    """
+    search_query = (search_query or '').strip()
+    buckets = get_cached_facets(
+        search_query, lambda: bucket_counts(search_query),
+        store=not reads_may_be_stale(),
+    )
+
+    categories = dict.fromkeys(dict(Note.CATEGORY_CHOICES), 0)
+    priorities = dict.fromkeys(dict(Note.PRIORITY_CHOICES), 0)
+    for bucket_category, bucket_priority, count in buckets:
+        if bucket_category in categories and (
+                not priority or bucket_priority == priority):
+            categories[bucket_category] += count
+        if bucket_priority in priorities and (
+                not category or bucket_category == category):
+            priorities[bucket_priority] += count
+
+    return {
+        'categories': [(value, label, categories[value])
+                       for value, label in Note.CATEGORY_CHOICES],
+        'priorities': [(value, label, priorities[value])
+                       for value, label in Note.PRIORITY_CHOICES],
+    }
+
+
+async def afacet_counts(search_query='', category='', priority=''):
+    """
+    Async version of facet_counts().
+
+    The cache lookup and, on a miss, the grouped query run together in one
+    worker thread, since the cache layer is synchronous.
+
+    Returns:
+        dict: ``categories`` and ``priorities`` facet counts
+    """
+    return await sync_to_async(facet_counts)(search_query, category, priority)
@@ -0,0 +1,336 @@
+"""
+Live note events for the sticky_notes_app.
+
+This module pushes note changes (created, updated, deleted, archived,
+unarchived and bulk actions) to browsers over Server-Sent Events, so an
+open note list can patch itself instead of being reloaded.
+
+Each process has one NoteEventBroker, which fans events out to the
+connected clients of that process through one bounded asyncio queue per
+client. On PostgreSQL, events are published with NOTIFY and every process
+runs a single LISTEN connection in a background thread, however many
+clients it serves, so a change made in one worker reaches the clients of
+all workers. On other databases events are dispatched in the process that
+made the change once its transaction commits.
+
+The broker keeps the most recent events so that a client reconnecting
+with ``Last-Event-ID`` receives what it missed. A client that cannot be
+brought up to date, because its last event is no longer known or because
+it fell too far behind, receives a ``reset`` event and reloads instead.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import uuid
+from collections import deque
+
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL NOTIFY channel the events are published on
+EVENT_CHANNEL = 'sticky_notes_events'
+
+# Recent events kept per process for clients that reconnect
+EVENT_BUFFER_SIZE = 500
+
+# Events queued for one client before it is sent a reset instead
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+# Milliseconds a disconnected browser waits before reconnecting
+RECONNECT_DELAY = 3000
+
+# Seconds the PostgreSQL listener waits before reconnecting after an error
+LISTENER_RETRY_DELAY = 5
+
+
+def make_event(event_type, note_id=None, **data):
+    """
+    Build a note event.
+
+    Args:
+        event_type (str): created, updated, deleted, archived, unarchived,
+            bulk or reset
+        note_id (int): Primary key of the note concerned, if any
+        **data: Additional JSON-serializable fields
+
+    Returns:
+        dict: The event, with a unique ``id``
+    """
+    return {'id': uuid.uuid4().hex, 'type': event_type, 'note': note_id,
+            **data}
+
+
+def format_event(event):
+    """
+    Encode an event as a Server-Sent Events message.
+
+    Args:
+        event (dict): The event to send
+
+    Returns:
+        str: The ``id`` and ``data`` fields of the message
+    """
+    return f"id: {event['id']}\ndata: {json.dumps(event)}\n\n"
+
+
+class Subscription:
+    """
+    The event queue of one connected client.
+
+    Events are put from any thread and read on the event loop the client
+    subscribed from.
+
+    Attributes:
+        loop: The event loop reading the queue
+        queue (asyncio.Queue): Events not yet sent to the client
+    """
+
+    def __init__(self, loop, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        """
+        Queue an event; must be called on the subscription's loop.
+
+        A client that is too slow to keep up has its backlog replaced by a
+        single reset event rather than holding memory without bound.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(make_event('reset'))
+
+    async def get(self):
+        """Wait for the next event."""
+        return await self.queue.get()
+
+
+class NoteEventBroker:
+    """
+    Fans note events out to the clients connected to this process.
+
+    Attributes:
+        buffer_size (int): Number of recent events kept for replay
+    """
+
+    def __init__(self, buffer_size=EVENT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._recent = deque(maxlen=buffer_size)
+        self._listener = None
+
+    @property
+    def subscriber_count(self):
+        """Number of clients currently connected."""
+        return len(self._subscribers)
+
+    def subscribe(self, last_event_id=None, using='default'):
+        """
+        Register a client on the running event loop.
+
+        Args:
+            last_event_id (str): ID of the last event the client received
+            using (str): Database alias whose changes are followed
+
+        Returns:
+            Subscription: The client's queue, holding any missed events
+        """
+        self.ensure_listener(using)
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            if last_event_id:
+                for event in self._missed_since(last_event_id):
+                    subscription.put(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a client registered with subscribe()."""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _missed_since(self, last_event_id):
+        """Return the recent events after an ID, or a reset if unknown."""
+        ids = [event['id'] for event in self._recent]
+        if last_event_id not in ids:
+            return [make_event('reset')]
+        return list(self._recent)[ids.index(last_event_id) + 1:]
+
+    def dispatch(self, event):
+        """
+        Send an event to every connected client of this process.
+
+        This may be called from any thread.
+
+        Args:
+            event (dict): The event to send
+        """
+        with self._lock:
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.put, event
+                )
+            except RuntimeError:
+                # The client's event loop has closed
+                self.unsubscribe(subscription)
+
+    def ensure_listener(self, using='default'):
+        """
+        Start this process's PostgreSQL listener if it is not running.
+
+        Other databases have no change feed; their events are dispatched
+        directly by publish_note_event().
+        """
+        if connections[using].vendor != 'postgresql':
+            return
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = PostgresListener(self, using)
+                self._listener.start()
+
+
+class PostgresListener(threading.Thread):
+    """
+    Receives the NOTIFY events of every process on one connection.
+
+    The connection is opened with the settings of a Django database alias
+    but is separate from Django's connections, since it stays in autocommit
+    mode for the lifetime of the process.
+
+    Attributes:
+        broker (NoteEventBroker): Receives the events
+        using (str): Database alias to listen on
+    """
+
+    def __init__(self, broker, using='default'):
+        super().__init__(name='sticky-notes-events', daemon=True)
+        self.broker = broker
+        self.using = using
+        self.stopped = threading.Event()
+
+    def run(self):
+        """Listen until stopped, reconnecting after errors."""
+        reconnecting = False
+        while not self.stopped.is_set():
+            try:
+                connection = self.connect()
+            except Exception:
+                logger.exception("Could not connect the event listener")
+                self.stopped.wait(LISTENER_RETRY_DELAY)
+                continue
+            if reconnecting:
+                # Events published while disconnected were lost
+                self.broker.dispatch(make_event('reset'))
+            try:
+                self.listen(connection)
+            except Exception:
+                logger.exception("The event listener lost its connection")
+                self.stopped.wait(LISTENER_RETRY_DELAY)
+            finally:
+                connection.close()
+            reconnecting = True
+
+    def stop(self):
+        """Ask the listener to exit after its current wait."""
+        self.stopped.set()
+
+    def connect(self):
+        """Open an autocommit connection listening on EVENT_CHANNEL."""
+        wrapper = connections[self.using]
+        connection = wrapper.Database.connect(
+            **wrapper.get_connection_params()
+        )
+        connection.autocommit = True
+        connection.cursor().execute(f'LISTEN {EVENT_CHANNEL}')
+        return connection
+
+    def listen(self, connection):
+        """Dispatch notifications until stopped or disconnected."""
+        while not self.stopped.is_set():
+            for notify in self.wait(connection):
+                self.broker.dispatch(json.loads(notify.payload))
+
+    def wait(self, connection):
+        """Return the notifications received within HEARTBEAT_INTERVAL."""
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        if is_psycopg3:
+            return connection.notifies(timeout=HEARTBEAT_INTERVAL)
+        select.select([connection], [], [], HEARTBEAT_INTERVAL)
+        connection.poll()
+        notifies = list(connection.notifies)
+        del connection.notifies[:]
+        return notifies
+
+
+# The broker of this process
+note_event_broker = NoteEventBroker()
+
+
+def publish_note_event(event_type, note_id=None, using='default', **data):
+    """
+    Publish a note event to the clients of every process.
+
+    The event is only delivered if the current transaction commits. On
+    PostgreSQL it is sent with NOTIFY, which the database holds back until
+    the commit; elsewhere it is dispatched to this process's broker from
+    an on_commit callback.
+
+    Args:
+        event_type (str): created, updated, deleted, archived, unarchived
+            or bulk
+        note_id (int): Primary key of the note concerned, if any
+        using (str): Database alias the change was made on
+        **data: Additional JSON-serializable fields
+    """
+    event = make_event(event_type, note_id, **data)
+    if connections[using].vendor == 'postgresql':
+        with connections[using].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)',
+                           [EVENT_CHANNEL, json.dumps(event)])
+    else:
+        transaction.on_commit(
+            lambda: note_event_broker.dispatch(event), using=using
+        )
+
+
+async def event_stream(subscription, heartbeat=HEARTBEAT_INTERVAL):
+    """
+    Yield a client's events as a Server-Sent Events stream.
+
+    A comment is sent whenever the stream has been idle for ``heartbeat``
+    seconds, so proxies keep the connection open. The client is
+    unsubscribed when the stream is closed.
+
+    Args:
+        subscription (Subscription): The client's queue
+        heartbeat (float): Seconds between keep-alive comments
+
+    Yields:
+        str: Server-Sent Events messages
+    """
+    try:
+        yield f'retry: {RECONNECT_DELAY}\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        note_event_broker.unsubscribe(subscription)
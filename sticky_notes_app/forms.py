@@ -10,6 +10,48 @@ from django import forms
 from .models import Note
 
 
+def clean_note_title(title):
+    """
+    Validate a note title.
+
+    Ensures the title is not empty or whitespace-only. This rule is shared
+    by NoteForm and the import_notes command.
+
+    Args:
+        title (str): The submitted title
+
+    Returns:
+        str: The stripped title
+
+    Raises:
+        ValidationError: If the title is empty or whitespace-only
+    """
+    if not title or title.strip() == '':
+        raise forms.ValidationError("Title is required.")
+    return title.strip()
+
+
+def clean_note_content(content):
+    """
+    Validate note content.
+
+    Ensures the content is not empty or whitespace-only. This rule is
+    shared by NoteForm and the import_notes command.
+
+    Args:
+        content (str): The submitted content
+
+    Returns:
+        str: The stripped content
+
+    Raises:
+        ValidationError: If the content is empty or whitespace-only
+    """
+    if not content or content.strip() == '':
+        raise forms.ValidationError("Content is required.")
+    return content.strip()
+
+
 class NoteForm(forms.ModelForm):
     """
     Form for creating and editing notes.
@@ -65,10 +107,7 @@ class NoteForm(forms.ModelForm):
         Raises:
             ValidationError: If the title is empty or whitespace-only
         """
-        title = self.cleaned_data.get('title')
-        if not title or title.strip() == '':
-            raise forms.ValidationError("Title is required.")
-        return title.strip()
+        return clean_note_title(self.cleaned_data.get('title'))
 
     def clean_content(self):
         """
@@ -82,10 +121,7 @@ class NoteForm(forms.ModelForm):
         Raises:
             ValidationError: If the content is empty or whitespace-only
         """
-        content = self.cleaned_data.get('content')
-        if not content or content.strip() == '':
-            raise forms.ValidationError("Content is required.")
-        return content.strip()
+        return clean_note_content(self.cleaned_data.get('content'))
 
 
 class NoteSearchForm(forms.Form):
@@ -0,0 +1 @@
+# Management commands for sticky_notes_app
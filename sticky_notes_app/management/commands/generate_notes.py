@@ -0,0 +1,335 @@
+"""
+Generation of synthetic note corpora for benchmarks.
+
+Usage::
+
+    python manage.py generate_notes 100000
+    python manage.py generate_notes 1000000 --seed 7 --archived-ratio 0.4
+    python manage.py generate_notes 50000 \\
+        --category-weights work=60,personal=20,other=20
+
+The notes look like real ones to the database: content lengths follow a
+log-normal distribution (many short notes, a long tail of long ones),
+words are drawn from a vocabulary with Zipf-like frequencies (so some
+search terms match a large share of notes, others few, and a handful of
+rare words almost none), categories and priorities are skewed, a share of
+the notes is archived, and creation and update times are spread over the
+past ``--days`` days.
+The same ``--seed`` always produces the same notes.
+"""
+
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from ...caching import invalidate_note_pages
+from ...events import publish_note_event
+from ...models import Note
+from .import_notes import BATCH_SIZE, CHUNK_SIZE
+
+# Words of the generated notes, most frequent first; the n-th word is
+# drawn with a weight of 1/n
+VOCABULARY = (
+    'the', 'to', 'and', 'a', 'for', 'of', 'on', 'with', 'in', 'call',
+    'meeting', 'buy', 'email', 'check', 'project', 'review', 'team',
+    'tomorrow', 'today', 'follow', 'up', 'report', 'client', 'milk',
+    'list', 'idea', 'draft', 'send', 'plan', 'week', 'notes', 'budget',
+    'update', 'book', 'order', 'fix', 'schedule', 'design', 'doctor',
+    'deadline', 'friday', 'monday', 'groceries', 'bread', 'eggs',
+    'coffee', 'presentation', 'slides', 'invoice', 'payment', 'release',
+    'bug', 'feature', 'sprint', 'roadmap', 'ticket', 'deploy', 'server',
+    'database', 'backup', 'password', 'renew', 'insurance', 'car',
+    'garden', 'birthday', 'gift', 'party', 'dinner', 'recipe', 'travel',
+    'flight', 'hotel', 'passport', 'visa', 'museum', 'concert', 'movie',
+    'podcast', 'article', 'research', 'interview', 'hiring', 'feedback',
+    'quarterly', 'metrics', 'dashboard', 'migration', 'refactor',
+    'benchmark', 'latency', 'throughput', 'kubernetes', 'terraform',
+    'dentist', 'plumber', 'landlord', 'mortgage', 'pension', 'tax',
+    'receipt', 'warranty', 'subscription', 'gym', 'yoga', 'marathon',
+    'bicycle', 'tent', 'canoe', 'telescope', 'origami', 'calligraphy',
+    'harpsichord', 'xylophone', 'zeppelin',
+)
+
+# Words outside the vocabulary, each added to about one note in
+# RARE_WORD_ODDS, for searches that match very few notes
+RARE_WORDS = ('quixotic', 'palimpsest', 'serendipity')
+
+# One note in this many gets each rare word
+RARE_WORD_ODDS = 10000
+
+# Share of the notes in each category
+CATEGORY_WEIGHTS = {
+    'personal': 30, 'work': 30, 'reminders': 15, 'shopping': 10,
+    'ideas': 10, 'other': 5,
+}
+
+# Share of the notes at each priority
+PRIORITY_WEIGHTS = {'low': 25, 'medium': 45, 'high': 22, 'urgent': 8}
+
+# Share of the notes that are archived
+ARCHIVED_RATIO = 0.2
+
+# Median length of a note's content, in characters
+CONTENT_MEDIAN = 160
+
+# Spread of the content lengths (sigma of the log-normal distribution)
+CONTENT_SIGMA = 1.0
+
+# Longest generated content, in characters
+CONTENT_MAX = 20000
+
+# Share of the notes updated some time after their creation
+EDITED_RATIO = 0.3
+
+# Writes the generated times of one inserted note
+TIMESTAMP_UPDATE = (
+    f'UPDATE {Note._meta.db_table} SET created_at = %s, updated_at = %s '
+    f'WHERE id = %s'
+)
+
+
+def parse_weights(value, choices):
+    """
+    Parse ``name=weight,...`` into weights for a field's choices.
+
+    Args:
+        value (str): The weights given on the command line
+        choices (list): The field's (value, label) choices
+
+    Returns:
+        dict: Choice value to weight
+
+    Raises:
+        CommandError: If a name is not a choice or a weight is invalid
+    """
+    valid = [choice for choice, _ in choices]
+    weights = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in valid:
+            raise CommandError(
+                f"Unknown choice {name!r}; expected one of {', '.join(valid)}."
+            )
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight for {name}: {weight!r}.")
+        if weights[name] < 0:
+            raise CommandError(f"Invalid weight for {name}: {weight!r}.")
+    if not sum(weights.values()):
+        raise CommandError("At least one weight must be positive.")
+    return weights
+
+
+def insert_notes(notes, batch_size):
+    """
+    Insert notes, keeping their generated creation and update times.
+
+    bulk_create() stamps created_at and updated_at with the current time,
+    like save(), so the generated times are written back afterwards, one
+    prepared UPDATE per note sent with executemany(). Turning off the
+    fields' auto_now flags instead would affect every thread of the
+    process, and bulk_update()'s CASE expressions made the command about
+    three times slower.
+
+    Args:
+        notes (list): Unsaved notes with their timestamps set
+        batch_size (int): Notes per INSERT and UPDATE statement
+    """
+    timestamps = [(note.created_at, note.updated_at) for note in notes]
+    Note.objects.bulk_create(notes, batch_size=batch_size)
+    connection = connections[router.db_for_write(Note)]
+    adapt = connection.ops.adapt_datetimefield_value
+    with connection.cursor() as cursor:
+        cursor.executemany(TIMESTAMP_UPDATE, [
+            (adapt(created_at), adapt(updated_at), note.pk)
+            for note, (created_at, updated_at) in zip(notes, timestamps)
+        ])
+
+
+class NoteGenerator:
+    """
+    Builds synthetic notes from a seeded random generator.
+
+    Attributes:
+        random (Random): Source of every random choice
+        now (datetime): Latest possible creation or update time
+        days (int): Span of the creation times, in days
+    """
+
+    def __init__(self, seed, categories, priorities,
+                 archived_ratio=ARCHIVED_RATIO, content_median=CONTENT_MEDIAN,
+                 content_sigma=CONTENT_SIGMA, days=365):
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.days = days
+        self.categories = list(categories)
+        self.category_weights = list(accumulate(categories.values()))
+        self.priorities = list(priorities)
+        self.priority_weights = list(accumulate(priorities.values()))
+        self.word_weights = list(accumulate(
+            1 / rank for rank in range(1, len(VOCABULARY) + 1)
+        ))
+        self.archived_ratio = archived_ratio
+        self.content_median = content_median
+        self.content_sigma = content_sigma
+
+    def words(self, count):
+        """Draw ``count`` words from the vocabulary."""
+        return self.random.choices(
+            VOCABULARY, cum_weights=self.word_weights, k=count
+        )
+
+    def content(self):
+        """Build content with a log-normally distributed length."""
+        length = self.random.lognormvariate(0, self.content_sigma)
+        length = min(max(int(length * self.content_median), 1), CONTENT_MAX)
+        # Words average about six characters with their separator
+        text = ' '.join(self.words(max(length // 6, 1)))
+        text = text[:length].strip() or VOCABULARY[0]
+        for word in RARE_WORDS:
+            if self.random.randrange(RARE_WORD_ODDS) == 0:
+                text += f' {word}'
+        return text
+
+    def note(self):
+        """Build one unsaved note."""
+        rng = self.random
+        created_at = self.now - timedelta(seconds=rng.uniform(
+            0, self.days * 86400
+        ))
+        updated_at = created_at
+        if rng.random() < EDITED_RATIO:
+            updated_at += (self.now - created_at) * rng.random()
+        return Note(
+            title=' '.join(self.words(rng.randint(2, 8))).capitalize(),
+            content=self.content(),
+            category=rng.choices(
+                self.categories, cum_weights=self.category_weights
+            )[0],
+            priority=rng.choices(
+                self.priorities, cum_weights=self.priority_weights
+            )[0],
+            is_archived=rng.random() < self.archived_ratio,
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+
+
+class Command(BaseCommand):
+    """
+    Generate synthetic notes.
+
+    Attributes:
+        help (str): Description shown by ``manage.py help generate_notes``
+    """
+
+    help = "Generate a realistic synthetic corpus of notes for benchmarks."
+
+    def add_arguments(self, parser):
+        """Define the command's arguments."""
+        parser.add_argument('count', type=int, help="Notes to generate")
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help="Random seed; the same seed generates the same notes"
+        )
+        parser.add_argument(
+            '--archived-ratio', type=float, default=ARCHIVED_RATIO,
+            help="Share of archived notes (0 to 1)"
+        )
+        parser.add_argument(
+            '--category-weights',
+            help="Weights as category=weight,... (default: "
+                 + ','.join(f'{k}={v}' for k, v in CATEGORY_WEIGHTS.items())
+                 + ')'
+        )
+        parser.add_argument(
+            '--priority-weights',
+            help="Weights as priority=weight,... (default: "
+                 + ','.join(f'{k}={v}' for k, v in PRIORITY_WEIGHTS.items())
+                 + ')'
+        )
+        parser.add_argument(
+            '--content-median', type=int, default=CONTENT_MEDIAN,
+            help="Median content length, in characters"
+        )
+        parser.add_argument(
+            '--content-sigma', type=float, default=CONTENT_SIGMA,
+            help="Spread of the content lengths (log-normal sigma)"
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help="Spread of the creation times, in days before now"
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help="Notes per INSERT statement"
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help="Notes per transaction"
+        )
+
+    def handle(self, *args, **options):
+        """
+        Generate and insert the notes.
+
+        Raises:
+            CommandError: If an option is out of range
+        """
+        count = options['count']
+        if count < 0:
+            raise CommandError("count must not be negative.")
+        if not 0 <= options['archived_ratio'] <= 1:
+            raise CommandError("--archived-ratio must be between 0 and 1.")
+        if options['content_median'] < 1 or options['days'] < 0:
+            raise CommandError(
+                "--content-median must be positive and --days not negative."
+            )
+        categories = (
+            parse_weights(options['category_weights'], Note.CATEGORY_CHOICES)
+            if options['category_weights'] else CATEGORY_WEIGHTS
+        )
+        priorities = (
+            parse_weights(options['priority_weights'], Note.PRIORITY_CHOICES)
+            if options['priority_weights'] else PRIORITY_WEIGHTS
+        )
+        generator = NoteGenerator(
+            options['seed'], categories, priorities,
+            archived_ratio=options['archived_ratio'],
+            content_median=options['content_median'],
+            content_sigma=options['content_sigma'],
+            days=options['days'],
+        )
+
+        start = time.perf_counter()
+        created = 0
+        while created < count:
+            size = min(options['chunk_size'], count - created)
+            with transaction.atomic():
+                insert_notes([generator.note() for _ in range(size)],
+                             options['batch_size'])
+            created += size
+            if created < count:
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{created} generated ({created / elapsed:,.0f} rows/s)"
+                )
+
+        if created:
+            # bulk_create sends no post_save signals
+            invalidate_note_pages()
+            publish_note_event('bulk', action='generate', affected=created)
+
+        elapsed = time.perf_counter() - start
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {created} notes in {elapsed:.2f}s "
+            f"({rate:,.0f} rows/s)."
+        ))
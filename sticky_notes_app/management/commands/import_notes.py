@@ -0,0 +1,313 @@
+"""
+Bulk import of notes from CSV or JSON Lines files.
+
+Usage::
+
+    python manage.py import_notes notes.csv
+    python manage.py import_notes notes.jsonl --rejects bad_rows.jsonl
+    cat notes.jsonl | python manage.py import_notes - --format jsonl
+
+Each row has a ``title`` and ``content`` and optionally a ``category``,
+``priority`` and ``is_archived``; missing optional fields take the model
+defaults. Rows are read as a stream and validated with the same rules as
+NoteForm. Valid rows are inserted with bulk_create, one transaction per
+chunk of rows. Invalid rows are written to a rejects file in JSON Lines
+format, with their line number and errors, and do not stop the import.
+"""
+
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from ...caching import invalidate_note_pages
+from ...events import publish_note_event
+from ...forms import clean_note_content, clean_note_title
+from ...models import Note
+
+# Fields read from each row
+IMPORT_FIELDS = ('title', 'content', 'category', 'priority', 'is_archived')
+
+# Spellings of is_archived accepted in CSV files
+BOOLEAN_VALUES = {
+    'true': True, 'yes': True, '1': True, 't': True, 'y': True,
+    'false': False, 'no': False, '0': False, 'f': False, 'n': False,
+}
+
+# NoteForm's rules, applied before the model field's own validation
+FIELD_CLEANERS = {
+    'title': clean_note_title,
+    'content': clean_note_content,
+}
+
+# Rows inserted by one INSERT statement
+BATCH_SIZE = 1000
+
+# Rows committed by one transaction
+CHUNK_SIZE = 10000
+
+
+def read_csv(stream):
+    """
+    Read a CSV stream with a header row.
+
+    Yields:
+        tuple: (line number, row dict, None)
+    """
+    reader = csv.DictReader(stream)
+    try:
+        for row in reader:
+            yield reader.line_num, row, None
+    except csv.Error as exc:
+        raise CommandError(f"Malformed CSV at line {reader.line_num}: {exc}")
+
+
+def read_jsonl(stream):
+    """
+    Read a JSON Lines stream, skipping blank lines.
+
+    Yields:
+        tuple: (line number, row dict, None), or (line number, None,
+        error message) for a line that is not a JSON object
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Expected a JSON object."
+            continue
+        yield line_number, row, None
+
+
+READERS = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+}
+
+
+def parse_boolean(value):
+    """
+    Convert a CSV or JSON boolean to a bool.
+
+    Raises:
+        ValidationError: If the value is not a recognised boolean
+    """
+    if isinstance(value, bool):
+        return value
+    try:
+        return BOOLEAN_VALUES[str(value).strip().lower()]
+    except KeyError:
+        raise ValidationError(f"{value!r} is not true or false.")
+
+
+def clean_row(row):
+    """
+    Validate one input row and build its note.
+
+    Args:
+        row (dict): Field name to raw value
+
+    Returns:
+        tuple: (note, errors); note is an unsaved Note when the row is
+        valid, otherwise errors maps field names to messages
+    """
+    values = {}
+    errors = {}
+    for name in IMPORT_FIELDS:
+        field = Note._meta.get_field(name)
+        value = row.get(name)
+        if isinstance(value, str):
+            # As NoteForm's fields do
+            value = value.strip()
+        if value in (None, '') and field.has_default():
+            value = field.get_default()
+        try:
+            if name == 'is_archived':
+                value = parse_boolean(value)
+            elif value is not None and not isinstance(value, str):
+                # JSON Lines rows may hold numbers, lists or objects
+                raise ValidationError(
+                    f"Expected text, not {type(value).__name__}."
+                )
+            if name in FIELD_CLEANERS:
+                value = FIELD_CLEANERS[name](value)
+            # Length, choice and type checks of the model field
+            value = field.clean(value, None)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+        else:
+            values[name] = value
+    if errors:
+        return None, errors
+    return Note(**values), None
+
+
+class Command(BaseCommand):
+    """
+    Import notes from a CSV or JSON Lines file.
+
+    Attributes:
+        help (str): Description shown by ``manage.py help import_notes``
+    """
+
+    help = ("Import notes from a CSV or JSON Lines file, rejecting invalid "
+            "rows to a side file.")
+
+    def add_arguments(self, parser):
+        """Define the command's arguments."""
+        parser.add_argument(
+            'path', help="File to import, or - to read standard input"
+        )
+        parser.add_argument(
+            '--format', choices=sorted(READERS),
+            help="Input format; by default taken from the file extension"
+        )
+        parser.add_argument(
+            '--rejects',
+            help="File receiving invalid rows "
+                 "(default: <path>.rejects.jsonl)"
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help="Rows per INSERT statement"
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help="Rows per transaction"
+        )
+
+    def handle(self, *args, **options):
+        """
+        Run the import.
+
+        Raises:
+            CommandError: If the input cannot be read or its format is
+                unknown
+        """
+        path = options['path']
+        input_format = options['format'] or Path(path).suffix.lstrip('.')
+        if input_format == 'ndjson':
+            input_format = 'jsonl'
+        if input_format not in READERS:
+            raise CommandError(
+                "Cannot tell the input format; use --format csv or jsonl."
+            )
+        self.rejects_path = options['rejects'] or (
+            'rejects.jsonl' if path == '-' else f'{path}.rejects.jsonl'
+        )
+        self.rejects_file = None
+        self.batch_size = options['batch_size']
+
+        try:
+            stream = (sys.stdin if path == '-'
+                      else open(path, newline='', encoding='utf-8'))
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+        start = time.perf_counter()
+        imported = rejected = 0
+        try:
+            chunk = []
+            for line_number, row, error in READERS[input_format](stream):
+                if error:
+                    self.reject(line_number, None, {'row': [error]})
+                    rejected += 1
+                    continue
+                note, errors = clean_row(row)
+                if errors:
+                    self.reject(line_number, row, errors)
+                    rejected += 1
+                    continue
+                chunk.append((line_number, row, note))
+                if len(chunk) >= options['chunk_size']:
+                    inserted = self.insert_chunk(chunk)
+                    imported += inserted
+                    rejected += len(chunk) - inserted
+                    chunk = []
+                    self.report(imported, rejected, start)
+            if chunk:
+                inserted = self.insert_chunk(chunk)
+                imported += inserted
+                rejected += len(chunk) - inserted
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if self.rejects_file:
+                self.rejects_file.close()
+
+        if imported:
+            # bulk_create sends no post_save signals
+            invalidate_note_pages()
+            publish_note_event('bulk', action='import', affected=imported)
+
+        elapsed = time.perf_counter() - start
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} notes in {elapsed:.2f}s "
+            f"({rate:,.0f} rows/s)."
+        ))
+        if rejected:
+            self.stdout.write(self.style.WARNING(
+                f"Rejected {rejected} rows; see {self.rejects_path}."
+            ))
+
+    def insert_chunk(self, chunk):
+        """
+        Insert a chunk of valid rows in one transaction.
+
+        If the database refuses the chunk, its rows are inserted one by
+        one so that only the rows it refuses are rejected.
+
+        Args:
+            chunk (list): (line number, row, note) triples
+
+        Returns:
+            int: Number of notes inserted
+        """
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(
+                    [note for _, _, note in chunk],
+                    batch_size=self.batch_size,
+                )
+            return len(chunk)
+        except DatabaseError:
+            pass
+
+        inserted = 0
+        for line_number, row, note in chunk:
+            try:
+                with transaction.atomic():
+                    note.pk = None
+                    Note.objects.bulk_create([note])
+                inserted += 1
+            except DatabaseError as exc:
+                self.reject(line_number, row, {'database': [str(exc)]})
+        return inserted
+
+    def reject(self, line_number, row, errors):
+        """Write an invalid row to the rejects file."""
+        if self.rejects_file is None:
+            self.rejects_file = open(self.rejects_path, 'w',
+                                     encoding='utf-8')
+        self.rejects_file.write(json.dumps(
+            {'line': line_number, 'row': row, 'errors': errors}
+        ) + '\n')
+
+    def report(self, imported, rejected, start):
+        """Print the progress of the import."""
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{imported} imported, {rejected} rejected "
+            f"({imported / elapsed:,.0f} rows/s)"
+        )
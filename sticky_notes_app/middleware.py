@@ -0,0 +1,94 @@
+"""
+Middleware for the sticky_notes_app.
+
+ReplicaPinMiddleware chooses the database each request reads from (see
+routers.py) and gives clients read-your-writes consistency: a request
+with an unsafe method reads from the primary, and so do the requests of
+the same client for the replica lag that follows, marked by a short-lived
+pin cookie.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .routers import (
+    choose_read_alias, get_replica_lag, get_replicas, reset_read_alias,
+    set_read_alias
+)
+
+# Cookie keeping a client's reads on the primary after it writes
+PIN_COOKIE = 'sticky_notes_primary'
+
+# Methods that never write, whose requests may read from a replica
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReplicaPinMiddleware:
+    """
+    Route each request's reads to a replica or, after a write, the primary.
+
+    The middleware works with both WSGI and ASGI; under ASGI the chosen
+    database also applies to synchronous views, which run with a copy of
+    the request's context.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Handle a request with its reads routed."""
+        if self.async_mode:
+            return self.__acall__(request)
+        token = set_read_alias(self.read_alias(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_alias(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        """Handle a request with its reads routed, under ASGI."""
+        token = set_read_alias(self.read_alias(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_read_alias(token)
+        return self.pin(request, response)
+
+    def read_alias(self, request):
+        """
+        Choose the database a request reads from.
+
+        Args:
+            request: The HTTP request object
+
+        Returns:
+            str: The primary for writes and pinned clients, else a replica
+        """
+        writes = request.method not in SAFE_METHODS
+        return choose_read_alias(
+            use_primary=writes or PIN_COOKIE in request.COOKIES
+        )
+
+    def pin(self, request, response):
+        """
+        Keep the client on the primary after a request that may write.
+
+        Args:
+            request: The HTTP request object
+            response: The response to the request
+
+        Returns:
+            HttpResponse: The response, with the pin cookie if needed
+        """
+        if request.method not in SAFE_METHODS and get_replicas():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=get_replica_lag(),
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Note',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(help_text='The title of the note', max_length=200)),
+                ('content', models.TextField(help_text='The main content of the note')),
+                ('category', models.CharField(choices=[('personal', 'Personal'), ('work', 'Work'), ('shopping', 'Shopping'), ('ideas', 'Ideas'), ('reminders', 'Reminders'), ('other', 'Other')], default='other', help_text='Category classification for the note', max_length=50)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], default='medium', help_text='Priority level of the note', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the note was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the note was last updated')),
+                ('is_archived', models.BooleanField(default=False, help_text='Whether the note is archived or not')),
+            ],
+            options={
+                'verbose_name': 'Note',
+                'verbose_name_plural': 'Notes',
+                'ordering': ['-updated_at'],
+                'indexes': [models.Index(fields=['is_archived', '-updated_at'], name='note_archived_updated_idx'), models.Index(fields=['is_archived', 'category', '-updated_at'], name='note_arch_cat_updated_idx'), models.Index(fields=['is_archived', 'priority', '-updated_at'], name='note_arch_prio_updated_idx'), models.Index(condition=models.Q(('is_archived', False)), fields=['-updated_at'], name='note_active_updated_idx'), models.Index(condition=models.Q(('is_archived', False)), fields=['category', '-updated_at'], name='note_active_cat_updated_idx'), models.Index(condition=models.Q(('is_archived', False)), fields=['priority', '-updated_at'], name='note_active_prio_updated_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,154 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:06
+"""
+Create the per-combination note counters and the triggers maintaining them.
+
+On SQLite and PostgreSQL, triggers on the note table keep one NoteCount
+row per (is_archived, category, priority) combination up to date, and
+the existing notes are counted once. Other backends get an empty table
+and keep counting the note table.
+"""
+
+from django.db import migrations, models
+
+NOTE_TABLE = 'sticky_notes_app_note'
+COUNT_TABLE = 'sticky_notes_app_notecount'
+
+# Matches the counter row of the old or new version of a note
+OLD_BUCKET = (
+    "is_archived = old.is_archived AND category = old.category "
+    "AND priority = old.priority"
+)
+
+BACKFILL = f"""
+    INSERT INTO {COUNT_TABLE} (is_archived, category, priority, count)
+    SELECT is_archived, category, priority, COUNT(*) FROM {NOTE_TABLE}
+    GROUP BY is_archived, category, priority
+"""
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE TRIGGER {COUNT_TABLE}_ai AFTER INSERT ON {NOTE_TABLE} BEGIN
+        INSERT INTO {COUNT_TABLE} (is_archived, category, priority, count)
+        VALUES (new.is_archived, new.category, new.priority, 1)
+        ON CONFLICT (is_archived, category, priority)
+        DO UPDATE SET count = count + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {COUNT_TABLE}_ad AFTER DELETE ON {NOTE_TABLE} BEGIN
+        UPDATE {COUNT_TABLE} SET count = count - 1 WHERE {OLD_BUCKET};
+    END
+    """,
+    f"""
+    CREATE TRIGGER {COUNT_TABLE}_au
+    AFTER UPDATE OF is_archived, category, priority ON {NOTE_TABLE}
+    WHEN old.is_archived IS NOT new.is_archived
+        OR old.category IS NOT new.category
+        OR old.priority IS NOT new.priority
+    BEGIN
+        UPDATE {COUNT_TABLE} SET count = count - 1 WHERE {OLD_BUCKET};
+        INSERT INTO {COUNT_TABLE} (is_archived, category, priority, count)
+        VALUES (new.is_archived, new.category, new.priority, 1)
+        ON CONFLICT (is_archived, category, priority)
+        DO UPDATE SET count = count + 1;
+    END
+    """,
+    BACKFILL,
+]
+
+SQLITE_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {COUNT_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {COUNT_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {COUNT_TABLE}_ai",
+]
+
+POSTGRESQL_FORWARD = [
+    f"""
+    CREATE FUNCTION {COUNT_TABLE}_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE {COUNT_TABLE} SET count = count - 1 WHERE {OLD_BUCKET};
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO {COUNT_TABLE} (is_archived, category, priority, count)
+            VALUES (new.is_archived, new.category, new.priority, 1)
+            ON CONFLICT (is_archived, category, priority)
+            DO UPDATE SET count = {COUNT_TABLE}.count + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    f"""
+    CREATE TRIGGER {COUNT_TABLE}_insert_delete
+    AFTER INSERT OR DELETE ON {NOTE_TABLE}
+    FOR EACH ROW EXECUTE FUNCTION {COUNT_TABLE}_update()
+    """,
+    f"""
+    CREATE TRIGGER {COUNT_TABLE}_update
+    AFTER UPDATE OF is_archived, category, priority ON {NOTE_TABLE}
+    FOR EACH ROW
+    WHEN (old.is_archived IS DISTINCT FROM new.is_archived
+          OR old.category IS DISTINCT FROM new.category
+          OR old.priority IS DISTINCT FROM new.priority)
+    EXECUTE FUNCTION {COUNT_TABLE}_update()
+    """,
+    BACKFILL,
+]
+
+POSTGRESQL_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {COUNT_TABLE}_update ON {NOTE_TABLE}",
+    f"DROP TRIGGER IF EXISTS {COUNT_TABLE}_insert_delete ON {NOTE_TABLE}",
+    f"DROP FUNCTION IF EXISTS {COUNT_TABLE}_update()",
+]
+
+
+def run_statements(schema_editor, statements):
+    """Execute a list of raw SQL statements."""
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_count_triggers(apps, schema_editor):
+    """Install the counter triggers and count the existing notes."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        run_statements(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRESQL_FORWARD)
+
+
+def drop_count_triggers(apps, schema_editor):
+    """Remove the counter triggers."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        run_statements(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRESQL_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sticky_notes_app', '0002_note_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_archived', models.BooleanField()),
+                ('category', models.CharField(max_length=50)),
+                ('priority', models.CharField(max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Note count',
+                'verbose_name_plural': 'Note counts',
+                'constraints': [models.UniqueConstraint(fields=('is_archived', 'category', 'priority'), name='notecount_bucket_unique')],
+            },
+        ),
+        migrations.RunPython(create_count_triggers, drop_count_triggers),
+    ]
@@ -0,0 +1,115 @@
+"""
+Update the PostgreSQL note counters in a fixed order.
+
+The row-level trigger of 0003_note_counts decremented the old counter row
+of a note, then upserted the new one. Two transactions moving notes in
+opposite directions (work to personal and personal to work) locked the
+same two rows in opposite orders and could deadlock, and a multi-row
+statement locked one pair of rows per note in table order.
+
+Statement-level triggers now add up the moves of the whole statement from
+its transition tables and apply one delta per counter row, sorted by
+(is_archived, category, priority), so every transaction locks the rows it
+needs in the same order. Statements that move no note between counters
+write nothing. SQLite runs one writer at a time and keeps its triggers.
+"""
+
+from importlib import import_module
+
+from django.db import migrations
+
+NOTE_TABLE = 'sticky_notes_app_note'
+COUNT_TABLE = 'sticky_notes_app_notecount'
+
+# The row-level triggers this migration replaces
+previous = import_module('sticky_notes_app.migrations.0003_note_counts')
+
+# Adds the delta of each counter row, in key order; a decremented row
+# always exists, since it counts the notes that left it
+APPLY_DELTAS = f"""
+    INSERT INTO {COUNT_TABLE} (is_archived, category, priority, count)
+    SELECT is_archived, category, priority, SUM(delta)
+    FROM ({{moves}}) AS moves
+    GROUP BY is_archived, category, priority
+    HAVING SUM(delta) <> 0
+    ORDER BY is_archived, category, priority
+    ON CONFLICT (is_archived, category, priority)
+    DO UPDATE SET count = {COUNT_TABLE}.count + excluded.count
+"""
+
+# Counter moves of the notes in the transition tables
+OLD_MOVES = (
+    "SELECT is_archived, category, priority, -1 AS delta FROM old_notes"
+)
+NEW_MOVES = (
+    "SELECT is_archived, category, priority, 1 AS delta FROM new_notes"
+)
+UPDATE_MOVES = f"{OLD_MOVES} UNION ALL {NEW_MOVES}"
+
+POSTGRESQL_FORWARD = [
+    *previous.POSTGRESQL_REVERSE,
+    f"""
+    CREATE FUNCTION {COUNT_TABLE}_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {APPLY_DELTAS.format(moves=NEW_MOVES)};
+        ELSIF TG_OP = 'DELETE' THEN
+            {APPLY_DELTAS.format(moves=OLD_MOVES)};
+        ELSE
+            {APPLY_DELTAS.format(moves=UPDATE_MOVES)};
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    # Transition tables allow one event per trigger and no column list
+    f"""
+    CREATE TRIGGER {COUNT_TABLE}_insert
+    AFTER INSERT ON {NOTE_TABLE} REFERENCING NEW TABLE AS new_notes
+    FOR EACH STATEMENT EXECUTE FUNCTION {COUNT_TABLE}_update()
+    """,
+    f"""
+    CREATE TRIGGER {COUNT_TABLE}_delete
+    AFTER DELETE ON {NOTE_TABLE} REFERENCING OLD TABLE AS old_notes
+    FOR EACH STATEMENT EXECUTE FUNCTION {COUNT_TABLE}_update()
+    """,
+    f"""
+    CREATE TRIGGER {COUNT_TABLE}_update
+    AFTER UPDATE ON {NOTE_TABLE}
+    REFERENCING OLD TABLE AS old_notes NEW TABLE AS new_notes
+    FOR EACH STATEMENT EXECUTE FUNCTION {COUNT_TABLE}_update()
+    """,
+]
+
+POSTGRESQL_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {COUNT_TABLE}_update ON {NOTE_TABLE}",
+    f"DROP TRIGGER IF EXISTS {COUNT_TABLE}_delete ON {NOTE_TABLE}",
+    f"DROP TRIGGER IF EXISTS {COUNT_TABLE}_insert ON {NOTE_TABLE}",
+    f"DROP FUNCTION IF EXISTS {COUNT_TABLE}_update()",
+    # The row-level triggers, without the backfill
+    *previous.POSTGRESQL_FORWARD[:-1],
+]
+
+
+def order_count_updates(apps, schema_editor):
+    """Replace the row-level counter triggers on PostgreSQL."""
+    if schema_editor.connection.vendor == 'postgresql':
+        previous.run_statements(schema_editor, POSTGRESQL_FORWARD)
+
+
+def restore_row_triggers(apps, schema_editor):
+    """Restore the row-level counter triggers on PostgreSQL."""
+    if schema_editor.connection.vendor == 'postgresql':
+        previous.run_statements(schema_editor, POSTGRESQL_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sticky_notes_app', '0003_note_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(order_count_updates, restore_row_triggers),
+    ]
@@ -5,7 +5,198 @@ This module contains the data models for the sticky notes application,
 including the main Note model with all its fields, choices, and methods.
 """
 
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import connections, models, router, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Length, Substr
+from django.db.models.lookups import GreaterThan
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+
+from .search import get_search_backend
+
+# Number of content characters shown on list and search cards
+CARD_PREVIEW_LENGTH = 150
+
+# Columns rendered by the list and search cards (the primary key is implied)
+CARD_FIELDS = ('title', 'category', 'priority', 'updated_at')
+
+
+class NoteQuerySet(models.QuerySet):
+    """
+    Custom queryset for the Note model.
+
+    This queryset holds the filters shared by the list and search views so
+    both paths query notes the same way.
+    """
+
+    def active(self):
+        """
+        Restrict the queryset to non-archived notes.
+
+        Returns:
+            QuerySet: Notes that are not archived
+        """
+        return self.filter(is_archived=False)
+
+    def search(self, query, ranked=True):
+        """
+        Filter notes by a free-text query using the search backend.
+
+        Args:
+            query (str): The raw search query
+            ranked (bool): Whether to order results by relevance
+
+        Returns:
+            QuerySet: Notes matching the query
+        """
+        return get_search_backend(self.db).search(self, query, ranked)
+
+    def apply_filters(self, search_query='', category='', priority='',
+                      ranked=True):
+        """
+        Apply the search, category and priority filters.
+
+        Empty values leave the corresponding filter out.
+
+        Args:
+            search_query (str): Free-text query for title and content
+            category (str): Category value to filter by
+            priority (str): Priority value to filter by
+            ranked (bool): Whether to order search results by relevance
+
+        Returns:
+            QuerySet: Filtered queryset
+        """
+        queryset = self
+        if search_query:
+            queryset = queryset.search(search_query, ranked=ranked)
+        if category:
+            queryset = queryset.filter(category=category)
+        if priority:
+            queryset = queryset.filter(priority=priority)
+        return queryset
+
+    def for_cards(self):
+        """
+        Load only what the list and search cards render.
+
+        The content column is deferred; instead the database returns the
+        first CARD_PREVIEW_LENGTH characters as ``content_preview`` and a
+        ``content_truncated`` flag telling whether there is more.
+
+        Returns:
+            QuerySet: Notes with card columns and the content preview
+        """
+        return self.only(*CARD_FIELDS).annotate(
+            content_preview=Substr('content', 1, CARD_PREVIEW_LENGTH),
+            content_truncated=GreaterThan(
+                Length(Substr('content', CARD_PREVIEW_LENGTH + 1, 1)), 0
+            ),
+        )
+
+    def toggle_archived(self, pk):
+        """
+        Flip the archive flag of a note in a single UPDATE statement.
+
+        The new value is computed by the database (``NOT is_archived``), so
+        concurrent toggles never overwrite each other, and no other column
+        except updated_at is written. The new state is read back with
+        UPDATE ... RETURNING where the backend supports it.
+
+        Args:
+            pk (int): Primary key of the note
+
+        Returns:
+            bool: The new archive state, or None if no note matched
+        """
+        changes = {
+            'is_archived': ~F('is_archived'),
+            'updated_at': timezone.now(),
+        }
+        # self.db is the read database; a write must pick its own
+        db = self._db or router.db_for_write(self.model)
+        connection = connections[db]
+        # Backends with INSERT ... RETURNING (PostgreSQL, SQLite 3.35+)
+        # support UPDATE ... RETURNING as well.
+        if not connection.features.can_return_columns_from_insert:
+            with transaction.atomic(using=db):
+                if not self.using(db).filter(pk=pk).update(**changes):
+                    return None
+                return self.using(db).filter(pk=pk).values_list(
+                    'is_archived', flat=True
+                ).get()
+
+        query = self.filter(pk=pk).query.chain(UpdateQuery)
+        query.add_update_values(changes)
+        sql, params = query.get_compiler(db).as_sql()
+        column = connection.ops.quote_name('is_archived')
+        with transaction.mark_for_rollback_on_error(using=db):
+            with connection.cursor() as cursor:
+                cursor.execute(f'{sql} RETURNING {column}', params)
+                # fetchall() steps the statement to completion, releasing
+                # its write lock before the cursor is closed
+                rows = cursor.fetchall()
+        return bool(rows[0][0]) if rows else None
+
+    async def atoggle_archived(self, pk):
+        """
+        Async version of toggle_archived().
+
+        Args:
+            pk (int): Primary key of the note
+
+        Returns:
+            bool: The new archive state, or None if no note matched
+        """
+        return await sync_to_async(self.toggle_archived)(pk)
+
+
+class StyleMap:
+    """
+    Labels and badge CSS classes of the values of a choice field.
+
+    The lookups are built once from the field's choices, so rendering a
+    badge is a dictionary lookup rather than a dictionary built per call.
+    Each value's CSS class is ``<prefix>-<value>``, as defined in
+    ``css/style.css``.
+
+    Attributes:
+        prefix (str): CSS class prefix, such as 'category'
+        default (str): Value whose class unknown values are given
+        labels (dict): Value to label
+        css_classes (dict): Value to CSS class
+    """
+
+    def __init__(self, prefix, choices, default):
+        self.prefix = prefix
+        self.default = default
+        self.labels = dict(choices)
+        self.css_classes = {
+            value: f'{prefix}-{value}' for value in self.labels
+        }
+        self._default_class = self.css_classes[default]
+
+    def label(self, value):
+        """Return the label of a value, or the value itself if unknown."""
+        return self.labels.get(value, value)
+
+    def css_class(self, value):
+        """Return the CSS class of a value, or the default's if unknown."""
+        return self.css_classes.get(value, self._default_class)
+
+    def as_dict(self):
+        """
+        Describe every value, for the JSON API.
+
+        Returns:
+            dict: Value to ``{'label': ..., 'css_class': ...}``, in choice
+            order
+        """
+        return {
+            value: {'label': label, 'css_class': self.css_classes[value]}
+            for value, label in self.labels.items()
+        }
 
 
 class Note(models.Model):
@@ -26,6 +217,7 @@ class Note(models.Model):
 
     Meta:
         ordering: Notes are ordered by updated_at in descending order
+        indexes: Composite indexes matching the list and filter queries
         verbose_name: Human-readable name for the model
         verbose_name_plural: Human-readable plural name for the model
     """
@@ -80,9 +272,47 @@ class Note(models.Model):
         help_text="Whether the note is archived or not"
     )
 
+    objects = NoteQuerySet.as_manager()
+
     class Meta:
         """Meta options for the Note model."""
         ordering = ['-updated_at']
+        indexes = [
+            # Unfiltered list: WHERE is_archived ORDER BY updated_at DESC
+            models.Index(
+                fields=['is_archived', '-updated_at'],
+                name='note_archived_updated_idx',
+            ),
+            # Category filter on top of the archive flag
+            models.Index(
+                fields=['is_archived', 'category', '-updated_at'],
+                name='note_arch_cat_updated_idx',
+            ),
+            # Priority filter on top of the archive flag
+            models.Index(
+                fields=['is_archived', 'priority', '-updated_at'],
+                name='note_arch_prio_updated_idx',
+            ),
+            # Partial indexes over active notes only. Django renders the
+            # archive filter as ``NOT is_archived`` rather than an equality,
+            # which SQLite cannot match against the composite indexes above;
+            # backends without partial index support skip these.
+            models.Index(
+                fields=['-updated_at'],
+                condition=Q(is_archived=False),
+                name='note_active_updated_idx',
+            ),
+            models.Index(
+                fields=['category', '-updated_at'],
+                condition=Q(is_archived=False),
+                name='note_active_cat_updated_idx',
+            ),
+            models.Index(
+                fields=['priority', '-updated_at'],
+                condition=Q(is_archived=False),
+                name='note_active_prio_updated_idx',
+            ),
+        ]
         verbose_name = "Note"
         verbose_name_plural = "Notes"
 
@@ -102,13 +332,7 @@ class Note(models.Model):
         Returns:
             str: CSS class name corresponding to the note's priority level
         """
-        priority_colors = {
-            'low': 'priority-low',
-            'medium': 'priority-medium',
-            'high': 'priority-high',
-            'urgent': 'priority-urgent',
-        }
-        return priority_colors.get(self.priority, 'priority-medium')
+        return PRIORITY_STYLES.css_class(self.priority)
 
     def get_category_color(self):
         """
@@ -117,12 +341,81 @@ class Note(models.Model):
         Returns:
             str: CSS class name corresponding to the note's category
         """
-        category_colors = {
-            'personal': 'category-personal',
-            'work': 'category-work',
-            'shopping': 'category-shopping',
-            'ideas': 'category-ideas',
-            'reminders': 'category-reminders',
-            'other': 'category-other',
-        }
-        return category_colors.get(self.category, 'category-other')
\ No newline at end of file
+        return CATEGORY_STYLES.css_class(self.category)
+
+    def get_priority_display(self):
+        """
+        Get the label of the note's priority.
+
+        Replaces Django's generated method, which builds a dict of the
+        choices on every call.
+
+        Returns:
+            str: The priority's label, or the raw value if it is unknown
+        """
+        return PRIORITY_STYLES.label(self.priority)
+
+    def get_category_display(self):
+        """
+        Get the label of the note's category.
+
+        Replaces Django's generated method, which builds a dict of the
+        choices on every call.
+
+        Returns:
+            str: The category's label, or the raw value if it is unknown
+        """
+        return CATEGORY_STYLES.label(self.category)
+
+
+# Labels and badge classes of the categories and priorities, shared by the
+# Note helpers, the templates and the JSON API
+CATEGORY_STYLES = StyleMap('category', Note.CATEGORY_CHOICES, 'other')
+PRIORITY_STYLES = StyleMap('priority', Note.PRIORITY_CHOICES, 'medium')
+
+
+class NoteCount(models.Model):
+    """
+    Number of notes in one (is_archived, category, priority) combination.
+
+    The rows are maintained by database triggers (see migrations
+    0003_note_counts and 0004_note_count_lock_order) on SQLite and
+    PostgreSQL, so every write path, from Note.save() to queryset updates
+    and raw deletes, keeps them exact in the same transaction as the
+    change. Counting the notes of any archive,
+    category and priority filter is then a SUM over at most a few dozen
+    rows instead of a scan of the note table.
+
+    Attributes:
+        is_archived (BooleanField): Archive status of the counted notes
+        category (CharField): Category of the counted notes
+        priority (CharField): Priority of the counted notes
+        count (BigIntegerField): Number of notes with these values
+    """
+
+    is_archived = models.BooleanField()
+    category = models.CharField(max_length=50)
+    priority = models.CharField(max_length=20)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        """Meta options for the NoteCount model."""
+        constraints = [
+            # The triggers upsert on this combination
+            models.UniqueConstraint(
+                fields=['is_archived', 'category', 'priority'],
+                name='notecount_bucket_unique',
+            ),
+        ]
+        verbose_name = "Note count"
+        verbose_name_plural = "Note counts"
+
+    def __str__(self):
+        """
+        String representation of the NoteCount instance.
+
+        Returns:
+            str: The counted combination and its count
+        """
+        state = "archived" if self.is_archived else "active"
+        return f"{state}/{self.category}/{self.priority}: {self.count}"
@@ -0,0 +1,407 @@
+"""
+Pagination helpers for the sticky_notes_app.
+
+This module contains the keyset (cursor) paginator used as an opt-in
+alternative to Django's offset Paginator. Pages are located by the
+``(updated_at, id)`` of the last row seen instead of an OFFSET, so every
+page costs the same regardless of depth, and no COUNT(*) is issued.
+
+EstimatedPaginator numbers pages over an estimated count, as returned for
+searches by the counts module.
+
+paginate_notes() applies either mode to a request, so the list and search
+views page their results the same way; apaginate_notes() does the same for
+the async views.
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.paginator import (
+    EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+)
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+# Ordering required by the cursor paginator; id breaks updated_at ties
+CURSOR_ORDERING = ('-updated_at', '-pk')
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(note, reverse=False):
+    """
+    Build an opaque cursor token pointing at a note.
+
+    Args:
+        note (Note): The note the cursor points at
+        reverse (bool): True for a cursor that pages backwards
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps(
+        [note.updated_at.isoformat(), note.pk, int(reverse)],
+        separators=(',', ':')
+    )
+    token = base64.urlsafe_b64encode(payload.encode())
+    return token.decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token built by encode_cursor().
+
+    Args:
+        token (str): The cursor token
+
+    Returns:
+        tuple: (updated_at, pk, reverse)
+
+    Raises:
+        InvalidCursor: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        updated_at, pk, reverse = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+        updated_at = parse_datetime(updated_at)
+        if updated_at is None or not isinstance(pk, int):
+            raise ValueError(token)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise InvalidCursor(f"Invalid cursor: {token!r}") from exc
+    return updated_at, pk, bool(reverse)
+
+
+class CursorPage:
+    """
+    A single page of results from a CursorPaginator.
+
+    Attributes:
+        object_list: Notes on this page, in display order
+        next_cursor: Token for the following page, or None
+        previous_cursor: Token for the preceding page, or None
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} notes>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        """Return True if there is a following page."""
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        """Return True if there is a preceding page."""
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        """Return True if there is a preceding or following page."""
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator over notes ordered by ``(-updated_at, -id)``.
+
+    Each page fetches ``per_page + 1`` rows after (or before) the cursor
+    position; the extra row only tells whether another page exists.
+
+    Attributes:
+        queryset: Note queryset to paginate; its ordering is replaced
+        per_page: Number of notes per page
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by(*CURSOR_ORDERING)
+        self.per_page = int(per_page)
+
+    def page(self, cursor=None):
+        """
+        Return the page starting at a cursor.
+
+        Args:
+            cursor (str): Token from a previous page, or None for the
+                first page
+
+        Returns:
+            CursorPage: The requested page
+
+        Raises:
+            InvalidCursor: If the cursor token is malformed
+        """
+        queryset, reverse = self._page_queryset(cursor)
+        return self._page_from_rows(list(queryset), cursor, reverse)
+
+    async def apage(self, cursor=None):
+        """
+        Return the page starting at a cursor, reading rows asynchronously.
+
+        Args:
+            cursor (str): Token from a previous page, or None for the
+                first page
+
+        Returns:
+            CursorPage: The requested page
+
+        Raises:
+            InvalidCursor: If the cursor token is malformed
+        """
+        queryset, reverse = self._page_queryset(cursor)
+        rows = [row async for row in queryset]
+        return self._page_from_rows(rows, cursor, reverse)
+
+    def _page_queryset(self, cursor):
+        """
+        Build the query for the rows of a page and its look-ahead row.
+
+        Returns:
+            tuple: (queryset, reverse), where reverse is True if the rows
+            come back in reverse display order
+        """
+        if not cursor:
+            return self.queryset[:self.per_page + 1], False
+
+        updated_at, pk, reverse = decode_cursor(cursor)
+        if reverse:
+            queryset = self.queryset.filter(
+                Q(updated_at__gt=updated_at) |
+                Q(updated_at=updated_at, pk__gt=pk)
+            ).reverse()
+        else:
+            queryset = self.queryset.filter(
+                Q(updated_at__lt=updated_at) |
+                Q(updated_at=updated_at, pk__lt=pk)
+            )
+        return queryset[:self.per_page + 1], reverse
+
+    def _page_from_rows(self, rows, cursor, reverse):
+        """Build the CursorPage of the rows read for a cursor."""
+        has_more, rows = self._trim(rows)
+        if reverse:
+            rows.reverse()
+            return self._build_page(rows, True, has_more)
+        return self._build_page(rows, has_more, bool(cursor))
+
+    def _trim(self, rows):
+        """Split off the look-ahead row, returning (has_more, rows)."""
+        return len(rows) > self.per_page, rows[:self.per_page]
+
+    def _build_page(self, rows, has_next, has_previous):
+        """Build a CursorPage with tokens for the neighbouring pages."""
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(rows[-1])
+        if rows and has_previous:
+            previous_cursor = encode_cursor(rows[0], reverse=True)
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+
+class EstimatedPage(Page):
+    """
+    A page from an EstimatedPaginator.
+
+    Whether a following page exists is known from the rows fetched, not
+    from the estimated number of pages.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        """Return True if there is a following page."""
+        return self._has_next
+
+
+class EstimatedPaginator(Paginator):
+    """
+    Page number paginator over an estimated count.
+
+    Page numbers are not checked against the estimate: each page fetches
+    ``per_page + 1`` rows, and the extra row tells whether another page
+    follows. An estimate that is too low or too high therefore never hides
+    results or links to empty pages. Since its pages are read eagerly, it
+    is also the paginator of the async views, with an exact count.
+
+    Attributes:
+        count: The estimated (or exact) number of objects
+        count_is_exact: True if count is exact
+    """
+
+    def __init__(self, object_list, per_page, count, exact=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+        self.count_is_exact = exact
+
+    def validate_number(self, number):
+        """
+        Validate a page number without an upper bound.
+
+        Raises:
+            PageNotAnInteger: If the number is not an integer
+            EmptyPage: If the number is less than 1
+        """
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        """
+        Return a page, checking that it has rows.
+
+        Raises:
+            EmptyPage: If a page after the first has no rows
+        """
+        number = self.validate_number(number)
+        return self._page_from_rows(list(self._page_slice(number)), number)
+
+    async def apage(self, number):
+        """
+        Return a page, reading its rows asynchronously.
+
+        Raises:
+            EmptyPage: If a page after the first has no rows
+        """
+        number = self.validate_number(number)
+        rows = [row async for row in self._page_slice(number)]
+        return self._page_from_rows(rows, number)
+
+    def _page_slice(self, number):
+        """Return the rows of a page plus the look-ahead row."""
+        bottom = (number - 1) * self.per_page
+        return self.object_list[bottom:bottom + self.per_page + 1]
+
+    def _page_from_rows(self, rows, number):
+        """Build the EstimatedPage of the rows read for a page."""
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        has_next = len(rows) > self.per_page
+        return EstimatedPage(rows[:self.per_page], number, self, has_next)
+
+
+def uses_cursor_pagination(request):
+    """
+    Check whether a request asks for cursor pagination.
+
+    The ``pagination`` query parameter wins over the
+    STICKY_NOTES_LIST_PAGINATION setting.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        bool: True for cursor pagination, False for page numbers
+    """
+    default_mode = getattr(settings, 'STICKY_NOTES_LIST_PAGINATION', 'offset')
+    return request.GET.get('pagination', default_mode) == 'cursor'
+
+
+def paginate_notes(request, queryset, per_page, count=None, exact=True):
+    """
+    Paginate a note queryset by page number or by cursor.
+
+    Page numbers follow ListView: ``page`` may be a number or ``last``, and
+    an invalid page raises Http404. Cursor mode reads the ``cursor`` token.
+
+    Args:
+        request: The HTTP request object
+        queryset (QuerySet): The filtered notes to paginate
+        per_page (int): Number of notes per page
+        count (int): Number of notes in the queryset, if already known;
+            saves the page number paginator its COUNT query
+        exact (bool): False if count is an estimate, which pages with an
+            EstimatedPaginator
+
+    Returns:
+        tuple: (paginator, page, object_list, is_paginated), as returned
+        by MultipleObjectMixin.paginate_queryset()
+
+    Raises:
+        Http404: If the page number or cursor is invalid
+    """
+    if uses_cursor_pagination(request):
+        paginator = CursorPaginator(queryset, per_page)
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    if count is not None and not exact:
+        paginator = EstimatedPaginator(queryset, per_page, count)
+    else:
+        paginator = Paginator(queryset, per_page)
+        if count is not None:
+            paginator.count = count
+    page_number = request.GET.get('page') or 1
+    try:
+        if page_number == 'last':
+            page_number = paginator.num_pages
+        page = paginator.page(int(page_number))
+    except (InvalidPage, ValueError):
+        raise Http404("Invalid page.")
+    return (paginator, page, page.object_list, page.has_other_pages())
+
+
+async def apaginate_notes(request, queryset, per_page, count, exact=True):
+    """
+    Paginate a note queryset by page number or by cursor, asynchronously.
+
+    This is paginate_notes() for the async views: page rows are read with
+    async iteration, and the count, which the page number mode needs, must
+    be given since it is never computed here.
+
+    Args:
+        request: The HTTP request object
+        queryset (QuerySet): The filtered notes to paginate
+        per_page (int): Number of notes per page
+        count (int): Number of notes in the queryset
+        exact (bool): False if count is an estimate
+
+    Returns:
+        tuple: (paginator, page, object_list, is_paginated)
+
+    Raises:
+        Http404: If the page number or cursor is invalid
+    """
+    if uses_cursor_pagination(request):
+        paginator = CursorPaginator(queryset, per_page)
+        try:
+            page = await paginator.apage(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    paginator = EstimatedPaginator(queryset, per_page, count, exact=exact)
+    page_number = request.GET.get('page') or 1
+    try:
+        if page_number == 'last':
+            page_number = paginator.num_pages
+        page = await paginator.apage(page_number)
+    except InvalidPage:
+        raise Http404("Invalid page.")
+    return (paginator, page, page.object_list, page.has_other_pages())
@@ -0,0 +1,127 @@
+"""
+Database routing for the sticky_notes_app.
+
+ReplicaRouter sends reads of the app's models to the read replicas listed
+in the STICKY_NOTES_REPLICAS setting and every write to the primary
+(``default``) database. Other apps (sessions, auth, admin log) always use
+the primary.
+
+Replicas lag behind the primary, so a client that has just written is
+kept on the primary for STICKY_NOTES_REPLICA_LAG seconds: the
+ReplicaPinMiddleware routes every read of a write request, and of the
+requests that follow it while the client's pin cookie lasts, to the
+primary. Each request reads from a single database, chosen when it starts.
+"""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .caching import seconds_since_note_change
+
+# Database alias that receives every write
+PRIMARY = 'default'
+
+# Database alias the current request reads from, set by the middleware
+_read_alias = ContextVar('sticky_notes_read_alias', default=None)
+
+
+def get_replicas():
+    """Return the aliases of the configured read replicas."""
+    return list(getattr(settings, 'STICKY_NOTES_REPLICAS', []))
+
+
+def get_replica_lag():
+    """Return the seconds a replica may lag behind the primary."""
+    return getattr(settings, 'STICKY_NOTES_REPLICA_LAG', 5)
+
+
+def choose_read_alias(use_primary=False):
+    """
+    Choose the database a request reads from.
+
+    Args:
+        use_primary (bool): Whether the request must see the latest writes
+
+    Returns:
+        str: A random replica, or the primary if there is none or
+        use_primary is set
+    """
+    replicas = get_replicas()
+    if use_primary or not replicas:
+        return PRIMARY
+    return random.choice(replicas)
+
+
+def set_read_alias(alias):
+    """
+    Route the reads of the current request or task to a database.
+
+    Args:
+        alias (str): Database alias, or None to choose per query
+
+    Returns:
+        Token: Pass to reset_read_alias() to restore the previous alias
+    """
+    return _read_alias.set(alias)
+
+
+def reset_read_alias(token):
+    """Restore the read alias replaced by set_read_alias()."""
+    _read_alias.reset(token)
+
+
+def reads_may_be_stale():
+    """
+    Check whether the current reads may miss a recent write.
+
+    This is the case when reading from a replica less than the replica
+    lag after a note changed. Pages and counts computed from such reads
+    must not be cached, or they would outlive the lag. The time of the
+    last change is kept in the page cache, so it only covers writes made
+    by other processes when that cache is shared, as page caching
+    requires.
+
+    Returns:
+        bool: True if the current reads come from a lagging replica
+    """
+    if _read_alias.get() == PRIMARY or not get_replicas():
+        return False
+    elapsed = seconds_since_note_change()
+    return elapsed is not None and elapsed < get_replica_lag()
+
+
+class ReplicaRouter:
+    """
+    Route the app's reads to replicas and its writes to the primary.
+
+    Attributes:
+        app_label (str): App whose models are routed
+    """
+
+    app_label = 'sticky_notes_app'
+
+    def db_for_read(self, model, **hints):
+        """
+        Return the database the current request reads from.
+
+        Outside a request (management commands, scripts) each query goes
+        to a random replica.
+        """
+        if model._meta.app_label != self.app_label:
+            return None
+        return _read_alias.get() or choose_read_alias()
+
+    def db_for_write(self, model, **hints):
+        """Send every write of the app's models to the primary."""
+        if model._meta.app_label != self.app_label:
+            return None
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allow relations between objects of the primary and replicas."""
+        databases = {PRIMARY, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
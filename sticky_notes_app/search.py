@@ -0,0 +1,241 @@
+"""
+Search backends for the sticky_notes_app.
+
+This module contains the pluggable full-text search used by the note list
+and search views. Each backend turns a free-text query into a filtered,
+optionally ranked queryset:
+
+- SQLiteFTSSearchBackend queries an FTS5 virtual table kept in sync with
+  the notes table by triggers.
+- PostgresSearchBackend queries a stored, GIN-indexed tsvector column.
+- IContainsSearchBackend is the original ``icontains`` filter, used as the
+  fallback when no full-text index is available.
+
+The backend is chosen from the STICKY_NOTES_SEARCH_BACKEND setting (a dotted
+path) or, when that is not set, from the database vendor.
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVectorField
+)
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+# Names of the database objects created by the search migration
+FTS_TABLE = 'sticky_notes_app_note_fts'
+SEARCH_VECTOR_COLUMN = 'search_vector'
+
+# Upper bound on the number of terms sent to the full-text engine
+MAX_SEARCH_TERMS = 16
+
+# Weights applied by bm25() to the title and content FTS5 columns
+FTS_TITLE_WEIGHT = 10.0
+FTS_CONTENT_WEIGHT = 1.0
+
+
+def tokenize(query):
+    """
+    Split a free-text query into lowercase search terms.
+
+    Only word characters are kept, so the terms are always safe to embed
+    in FTS5 MATCH expressions and raw tsquery strings.
+
+    Args:
+        query (str): The raw search query
+
+    Returns:
+        list: Up to MAX_SEARCH_TERMS lowercase terms
+    """
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+class BaseSearchBackend:
+    """
+    Base class for note search backends.
+
+    Subclasses implement search() and may restrict themselves to a database
+    vendor and to databases where their index exists.
+
+    Attributes:
+        vendor: Database vendor the backend supports, or None for any
+    """
+
+    vendor = None
+
+    def is_available(self, using):
+        """
+        Check whether this backend can run against a database.
+
+        Args:
+            using (str): Database alias the queryset will run on
+
+        Returns:
+            bool: True if the backend can be used
+        """
+        return (
+            self.vendor is None or
+            connections[using].vendor == self.vendor
+        )
+
+    def search(self, queryset, query, ranked=True):
+        """
+        Filter a note queryset by a free-text query.
+
+        Args:
+            queryset (QuerySet): Note queryset to filter
+            query (str): The raw search query
+            ranked (bool): Whether to order results by relevance
+
+        Returns:
+            QuerySet: Matching notes, annotated with ``search_rank`` and
+            ordered by it when ranked is True
+        """
+        raise NotImplementedError
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    """
+    Case-insensitive substring search over title and content.
+
+    This backend cannot use any index and does not rank results; it is kept
+    as the portable fallback.
+    """
+
+    def search(self, queryset, query, ranked=True):
+        """Filter notes whose title or content contains the query."""
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query)
+        )
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    Full-text search backed by an SQLite FTS5 virtual table.
+
+    Every query term is matched as a prefix, and ranked results are ordered
+    by bm25() with title matches weighted above content matches.
+    """
+
+    vendor = 'sqlite'
+
+    # Cache of database alias -> whether the FTS table exists
+    _available = {}
+
+    def is_available(self, using):
+        """Check the vendor and that the FTS5 table has been created."""
+        if not super().is_available(using):
+            return False
+        if using not in self._available:
+            tables = connections[using].introspection.table_names()
+            self._available[using] = FTS_TABLE in tables
+        return self._available[using]
+
+    def search(self, queryset, query, ranked=True):
+        """Filter notes through an FTS5 MATCH, ranked by bm25()."""
+        terms = tokenize(query)
+        if not terms:
+            return IContainsSearchBackend().search(queryset, query, ranked)
+
+        match = ' '.join(f'"{term}"*' for term in terms)
+        if not ranked:
+            return queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [match]
+            ))
+
+        # Ranked results join the FTS table, so that the MATCH runs once
+        # and bm25() is read from its rows. A correlated subquery per
+        # note would run the MATCH again for every matching note. The
+        # ORM cannot join a table without a model, hence extra().
+        # bm25() is lower for better matches, so negate it to sort the
+        # same way as the PostgreSQL rank.
+        note_table = queryset.model._meta.db_table
+        return queryset.extra(
+            select={
+                'search_rank': f'-bm25("{FTS_TABLE}", {FTS_TITLE_WEIGHT}, '
+                               f'{FTS_CONTENT_WEIGHT})',
+            },
+            tables=[FTS_TABLE],
+            where=[
+                f'"{FTS_TABLE}" MATCH %s',
+                f'"{FTS_TABLE}".rowid = "{note_table}"."id"',
+            ],
+            params=[match],
+        ).order_by('-search_rank', '-updated_at')
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Full-text search backed by a stored PostgreSQL tsvector column.
+
+    The column weights title above content and is covered by a GIN index.
+    Every query term is matched as a prefix.
+
+    Attributes:
+        config: Text search configuration used to parse the query
+    """
+
+    vendor = 'postgresql'
+    config = 'english'
+
+    def search(self, queryset, query, ranked=True):
+        """Filter notes with a tsquery match, ranked by ts_rank."""
+        terms = tokenize(query)
+        if not terms:
+            return IContainsSearchBackend().search(queryset, query, ranked)
+
+        search_query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            search_type='raw',
+            config=self.config
+        )
+        note_table = queryset.model._meta.db_table
+        vector = RawSQL(
+            f'"{note_table}"."{SEARCH_VECTOR_COLUMN}"', [],
+            output_field=SearchVectorField()
+        )
+        queryset = queryset.alias(search_vector=vector).filter(
+            search_vector=search_query
+        )
+        if not ranked:
+            return queryset
+        return queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-search_rank', '-updated_at')
+
+
+# Backends tried in order when STICKY_NOTES_SEARCH_BACKEND is not set
+DEFAULT_BACKENDS = [
+    SQLiteFTSSearchBackend,
+    PostgresSearchBackend,
+]
+
+
+def get_search_backend(using='default'):
+    """
+    Return the search backend to use for a database.
+
+    Args:
+        using (str): Database alias the search will run on
+
+    Returns:
+        BaseSearchBackend: The configured backend, the first available
+        full-text backend for the vendor, or the icontains fallback
+    """
+    backend_path = getattr(settings, 'STICKY_NOTES_SEARCH_BACKEND', None)
+    if backend_path:
+        candidates = [import_string(backend_path)]
+    else:
+        candidates = DEFAULT_BACKENDS
+
+    for backend_class in candidates:
+        backend = backend_class()
+        if backend.is_available(using):
+            return backend
+    return IContainsSearchBackend()
@@ -0,0 +1,69 @@
+"""
+Signal handlers for the sticky_notes_app.
+
+This module keeps the note caches consistent with the database: any saved
+or deleted note invalidates the cached list pages, and a deleted note's
+card fragment is dropped. Every change is also published as a live note
+event (see events.py).
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import delete_note_card, invalidate_note_pages
+from .events import publish_note_event
+from .models import Note
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, created, using, **kwargs):
+    """
+    Invalidate cached list pages after a note is created or updated.
+
+    Args:
+        sender: The Note model class
+        instance (Note): The saved note
+        created (bool): Whether the note was created
+        using (str): Database alias the note was saved to
+        **kwargs: Additional signal arguments
+    """
+    invalidate_note_pages()
+    publish_note_event(
+        'created' if created else 'updated', instance.pk, using=using,
+        is_archived=instance.is_archived,
+    )
+
+
+@receiver(post_delete, sender=Note)
+def note_deleted(sender, instance, using, **kwargs):
+    """
+    Invalidate cached list pages and the card of a deleted note.
+
+    Args:
+        sender: The Note model class
+        instance (Note): The deleted note
+        using (str): Database alias the note was deleted from
+        **kwargs: Additional signal arguments
+    """
+    delete_note_card(instance)
+    invalidate_note_pages()
+    publish_note_event('deleted', instance.pk, using=using)
+
+
+def note_archive_toggled(pk, is_archived):
+    """
+    Invalidate cached list pages and publish an event after an archive
+    toggle.
+
+    NoteQuerySet.toggle_archived() is a queryset update, which sends no
+    post_save signal, so its callers call this instead.
+
+    Args:
+        pk (int): Primary key of the toggled note
+        is_archived (bool): The note's new archive status
+    """
+    invalidate_note_pages()
+    publish_note_event(
+        'archived' if is_archived else 'unarchived', pk,
+        is_archived=is_archived,
+    )
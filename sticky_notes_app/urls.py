@@ -7,26 +7,73 @@ The URLs are organized with clear naming conventions and proper namespacing.
 """
 
 from django.urls import path
-from . import views
+from . import api, async_views, views
 
 # Application namespace for URL reversing
 app_name = 'sticky_notes_app'
 
-# URL patterns for the sticky notes application
-urlpatterns = [
-    # Home page - redirects to note list
-    path('', views.home, name='home'),
-
-    # Note CRUD operations
-    path('notes/', views.NoteListView.as_view(), name='note_list'),
-    path('note/new/', views.NoteCreateView.as_view(), name='note_create'),
-    path('note/<int:pk>/', views.NoteDetailView.as_view(), name='note_detail'),
-    path('note/<int:pk>/edit/',
-         views.NoteUpdateView.as_view(), name='note_update'),
-    path('note/<int:pk>/delete/',
-         views.NoteDeleteView.as_view(), name='note_delete'),
-
-    # Additional functionality
-    path('note/<int:pk>/archive/', views.note_archive, name='note_archive'),
-    path('search/', views.note_search, name='note_search'),
-]
\ No newline at end of file
+
+def note_urlpatterns(list_view, detail_view, archive_view, search_view):
+    """
+    Build the URL patterns of the application around its main pages.
+
+    The list, detail, archive and search pages exist as synchronous views
+    (views.py) and async views (async_views.py); both sets are served
+    under the same paths and names, so templates and redirects work with
+    either.
+
+    Args:
+        list_view: View of the note list
+        detail_view: View of a single note
+        archive_view: View toggling the archive status of a note
+        search_view: View of the search results
+
+    Returns:
+        list: The URL patterns
+    """
+    return [
+        # Home page - redirects to note list
+        path('', views.home, name='home'),
+
+        # Note CRUD operations
+        path('notes/', list_view, name='note_list'),
+        path('note/new/', views.NoteCreateView.as_view(), name='note_create'),
+        path('note/<int:pk>/', detail_view, name='note_detail'),
+        path('note/<int:pk>/edit/',
+             views.NoteUpdateView.as_view(), name='note_update'),
+        path('note/<int:pk>/delete/',
+             views.NoteDeleteView.as_view(), name='note_delete'),
+
+        # Additional functionality
+        path('note/<int:pk>/archive/', archive_view, name='note_archive'),
+        path('note/<int:pk>/card/', views.note_card, name='note_card'),
+        path('search/', search_view, name='note_search'),
+
+        # Live note events (Server-Sent Events; requires ASGI)
+        path('events/', async_views.note_events, name='note_events'),
+
+        # JSON API
+        path('api/notes/', api.note_collection, name='api_note_list'),
+        path('api/notes/search/', api.note_search_api,
+             name='api_note_search'),
+        path('api/notes/bulk/', api.note_bulk, name='api_note_bulk'),
+        path('api/notes/export/', api.note_export, name='api_note_export'),
+        path('api/notes/styles/', api.note_styles, name='api_note_styles'),
+        path('api/notes/<int:pk>/', api.note_resource,
+             name='api_note_detail'),
+        path('api/notes/<int:pk>/archive/',
+             api.note_archive_api, name='api_note_archive'),
+
+        # Monitoring
+        path('stats/cache/', views.cache_stats, name='cache_stats'),
+    ]
+
+
+# URL patterns for the sticky notes application, with the synchronous
+# views; async_urls.py serves the same patterns with the async views
+urlpatterns = note_urlpatterns(
+    views.NoteListView.as_view(),
+    views.NoteDetailView.as_view(),
+    views.note_archive,
+    views.note_search,
+)
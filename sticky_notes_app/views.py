@@ -6,52 +6,175 @@ application, including class-based views for CRUD operations and function-based
 views for additional functionality like archiving and searching.
 """
 
-from django.shortcuts import render, get_object_or_404, redirect
+from itertools import islice
+
+from django.http import (
+    Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+)
+from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy
 from django.views.generic import (
     ListView, CreateView, UpdateView, DeleteView, DetailView
 )
 from django.contrib import messages
-from django.db.models import Q
+from django.views.decorators.http import require_GET, require_POST
+from .caching import (
+    cache_page_content, get_cache_stats, get_cached_page, render_note_cards
+)
+from .conditional import (
+    list_state, make_etag, not_modified, set_validators
+)
+from .counts import count_notes, facet_counts
 from .models import Note
 from .forms import NoteForm, NoteSearchForm
+from .pagination import paginate_notes, uses_cursor_pagination
+from .routers import reads_may_be_stale
+from .signals import note_archive_toggled
+
+# Notes shown per page by the list and search views
+NOTES_PER_PAGE = 10
+
+# Rows fetched per database round trip when streaming search results
+STREAM_CHUNK_SIZE = 200
+
+# Marker in the rendered search page where streamed cards are inserted
+STREAM_PLACEHOLDER = '<!-- sticky-notes:stream -->'
 
 
 class NoteListView(ListView):
     """
     View for displaying a list of notes with search and filter capabilities.
+
+    Pages are numbered by default. Cursor (keyset) pagination is used
+    instead when the request has ``pagination=cursor`` or the
+    STICKY_NOTES_LIST_PAGINATION setting is ``'cursor'``.
+
+    Rendered pages are cached per query string until a note changes, and
+    the note cards are rendered through the card fragment cache. Pages
+    carry ETag and Last-Modified validators computed from the filtered
+    notes, so a browser revisiting an unchanged page gets 304 Not Modified.
     """
     model = Note
     template_name = 'sticky_notes_app/note_list.html'
     context_object_name = 'notes'
-    paginate_by = 10
+    paginate_by = NOTES_PER_PAGE
+
+    # (count, exact) of the filtered notes, once counted
+    note_total = None
+
+    def get(self, request, *args, **kwargs):
+        """
+        Answer conditional requests, or serve the page from the page cache.
+
+        Cached pages are stored with their validators, so they are served
+        (or answered with 304) without any query. Otherwise the validators
+        are built from the newest updated_at and the counter rows of the
+        filtered notes, and the page is rendered and cached only if the
+        client's copy is stale. Requests with pending
+        flash messages bypass both, since the messages are rendered into
+        the page.
+
+        Args:
+            request: The HTTP request object
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            HttpResponse: 304 Not Modified, or the cached or freshly
+            rendered page
+        """
+        if len(messages.get_messages(request)):
+            return super().get(request, *args, **kwargs)
+
+        key, page = get_cached_page(request)
+        if page is not None:
+            etag, last_modified = page['etag'], page['last_modified']
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = set_validators(
+                    HttpResponse(page['content']), etag, last_modified
+                )
+            return response
+
+        filters = self.get_filters()
+        last_modified, count, facet_state = list_state(
+            category=filters['category'], priority=filters['priority']
+        )
+        if not filters['search_query']:
+            self.note_total = (count, True)
+        etag = make_etag(
+            'note_list', last_modified, count, facet_state,
+            sorted(request.GET.lists())
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = super().get(request, *args, **kwargs)
+
+        def store(rendered):
+            if rendered.status_code == 200 and not reads_may_be_stale():
+                cache_page_content(
+                    key, rendered.content, etag, last_modified
+                )
+
+        response.add_post_render_callback(store)
+        return set_validators(response, etag, last_modified)
+
+    def get_filters(self):
+        """
+        Read the search and filter parameters of the request.
+
+        Returns:
+            dict: ``search_query``, ``category`` and ``priority`` values,
+            as accepted by NoteQuerySet.apply_filters()
+        """
+        return {
+            'search_query': self.request.GET.get('search_query', ''),
+            'category': self.request.GET.get('category_filter', ''),
+            'priority': self.request.GET.get('priority_filter', ''),
+        }
 
     def get_queryset(self):
         """
         Filter notes based on search and filter parameters.
 
+        Search results are ranked by relevance, except under cursor
+        pagination, which always orders by last update. Only the columns
+        shown on the cards are loaded.
+
         Returns:
             QuerySet: Filtered queryset of non-archived notes
         """
-        queryset = Note.objects.filter(is_archived=False)
+        return Note.objects.active().for_cards().apply_filters(
+            ranked=not uses_cursor_pagination(self.request),
+            **self.get_filters()
+        )
 
-        search_query = self.request.GET.get('search_query', '')
-        category_filter = self.request.GET.get('category_filter', '')
-        priority_filter = self.request.GET.get('priority_filter', '')
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate the queryset by page number or by cursor.
 
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(content__icontains=search_query)
-            )
+        The notes are counted from the NoteCount rows, or estimated for
+        searches, so the paginator never runs a COUNT over the notes.
 
-        if category_filter:
-            queryset = queryset.filter(category=category_filter)
+        Args:
+            queryset: The filtered queryset to paginate
+            page_size (int): Number of notes per page
 
-        if priority_filter:
-            queryset = queryset.filter(priority=priority_filter)
+        Returns:
+            tuple: (paginator, page, object_list, is_paginated)
 
-        return queryset
+        Raises:
+            Http404: If the page number or cursor is invalid
+        """
+        if self.note_total is None:
+            self.note_total = count_notes(queryset, **self.get_filters())
+        count, exact = self.note_total
+        return paginate_notes(
+            self.request, queryset, page_size, count=count, exact=exact
+        )
 
     def get_context_data(self, **kwargs):
         """
@@ -61,12 +184,19 @@ class NoteListView(ListView):
             **kwargs: Additional keyword arguments
 
         Returns:
-            dict: Context dictionary with search form and choices
+            dict: Context dictionary with search form, choices and facet
+            counts
         """
         context = super().get_context_data(**kwargs)
         context['search_form'] = NoteSearchForm(self.request.GET)
         context['categories'] = Note.CATEGORY_CHOICES
         context['priorities'] = Note.PRIORITY_CHOICES
+        facets = facet_counts(**self.get_filters())
+        context['category_facets'] = facets['categories']
+        context['priority_facets'] = facets['priorities']
+        context['cursor_pagination'] = uses_cursor_pagination(self.request)
+        context['note_total'], context['note_total_exact'] = self.note_total
+        context['note_cards'] = render_note_cards(context['notes'])
         return context
 
 
@@ -120,7 +250,10 @@ class NoteDetailView(DetailView):
     View for displaying a single note's details.
 
     This view displays the full details of a specific note.
-    Only non-archived notes are accessible through this view.
+    Only non-archived notes are accessible through this view. Responses
+    carry ETag and Last-Modified validators derived from the note's
+    updated_at, so revisiting an unchanged note returns 304 Not Modified
+    without loading or rendering it.
 
     Attributes:
         model: The Note model to display
@@ -131,6 +264,46 @@ class NoteDetailView(DetailView):
     template_name = 'sticky_notes_app/note_detail.html'
     context_object_name = 'note'
 
+    def get(self, request, *args, **kwargs):
+        """
+        Answer conditional requests, or render the note.
+
+        Only the note's updated_at is read to build the validators; the
+        note itself is loaded only when the page has to be rendered.
+
+        Args:
+            request: The HTTP request object
+            *args: Additional positional arguments
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            HttpResponse: 304 Not Modified, or the rendered note
+
+        Raises:
+            Http404: If the note does not exist or is archived
+        """
+        if len(messages.get_messages(request)):
+            return super().get(request, *args, **kwargs)
+
+        updated_at = self.get_queryset().filter(
+            pk=self.kwargs['pk']
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404("No note found matching the query.")
+
+        etag = make_etag('note_detail', self.kwargs['pk'], updated_at)
+        response = not_modified(request, etag, updated_at)
+        if response is not None:
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        # Validators of the note actually rendered, in case it changed
+        updated_at = self.object.updated_at
+        return set_validators(
+            response, make_etag('note_detail', self.object.pk, updated_at),
+            updated_at
+        )
+
     def get_queryset(self):
         """
         Filter queryset to only include non-archived notes.
@@ -238,12 +411,15 @@ class NoteDeleteView(DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
+@require_POST
 def note_archive(request, pk):
     """
     Toggle the archive status of a note.
 
     This function-based view toggles the archive status of a note.
     If the note is currently archived, it will be unarchived, and vice versa.
+    The flag is flipped by a single UPDATE statement, so concurrent toggles
+    cannot lose each other's changes. Only POST requests are accepted.
 
     Args:
         request: The HTTP request object
@@ -251,12 +427,17 @@ def note_archive(request, pk):
 
     Returns:
         HttpResponseRedirect: Redirect to the note list page
+
+    Raises:
+        Http404: If the note does not exist
     """
-    note = get_object_or_404(Note, pk=pk)
-    note.is_archived = not note.is_archived
-    note.save()
+    is_archived = Note.objects.toggle_archived(pk)
+    if is_archived is None:
+        raise Http404("No note found matching the query.")
+    # A queryset update sends no post_save signal
+    note_archive_toggled(pk, is_archived)
 
-    action = "archived" if note.is_archived else "not archived"
+    action = "archived" if is_archived else "not archived"
     messages.success(request, f'Note {action} successfully!')
 
     return redirect('sticky_notes_app:note_list')
@@ -267,8 +448,9 @@ def note_search(request):
     Handle note search functionality.
 
     This function-based view processes search queries and filters notes
-    based on search terms, category, and priority. It renders the search
-    results in a dedicated template.
+    based on search terms, category, and priority. Results are paginated
+    like the note list; with ``stream=1`` every match is streamed instead.
+    Result counts of free-text searches are estimated (see counts.py).
 
     Args:
         request: The HTTP request object containing search parameters
@@ -277,35 +459,140 @@ def note_search(request):
         HttpResponse: Rendered search results page
     """
     form = NoteSearchForm(request.GET)
-    notes = Note.objects.filter(is_archived=False)  # type: ignore
+    cursor_pagination = uses_cursor_pagination(request)
+    notes = Note.objects.active().for_cards()  # type: ignore
 
+    filters = {}
     if form.is_valid():
-        search_query = form.cleaned_data.get('search_query')
-        category_filter = form.cleaned_data.get('category_filter')
-        priority_filter = form.cleaned_data.get('priority_filter')
-
-        if search_query:
-            notes = notes.filter(
-                Q(title__icontains=search_query) |
-                Q(content__icontains=search_query)
-            )
-
-        if category_filter:
-            notes = notes.filter(category=category_filter)
-
-        if priority_filter:
-            notes = notes.filter(priority=priority_filter)
-
+        filters = {
+            'search_query': form.cleaned_data.get('search_query'),
+            'category': form.cleaned_data.get('category_filter'),
+            'priority': form.cleaned_data.get('priority_filter'),
+        }
+        notes = notes.apply_filters(ranked=not cursor_pagination, **filters)
+
+    facets = facet_counts(**filters)
     context = {
-        'notes': notes,
         'search_form': form,
         'categories': Note.CATEGORY_CHOICES,
         'priorities': Note.PRIORITY_CHOICES,
+        'category_facets': facets['categories'],
+        'priority_facets': facets['priorities'],
+        'cursor_pagination': cursor_pagination,
     }
 
+    if request.GET.get('stream') == '1':
+        return stream_search_results(request, notes, context)
+
+    count, exact = count_notes(notes, **filters)
+    paginator, page, object_list, is_paginated = paginate_notes(
+        request, notes, NOTES_PER_PAGE, count=count, exact=exact
+    )
+    context.update({
+        'note_total': count,
+        'note_total_exact': exact,
+        'notes': object_list,
+        'note_cards': render_note_cards(object_list),
+        'paginator': paginator,
+        'page_obj': page,
+        'is_paginated': is_paginated,
+    })
     return render(request, 'sticky_notes_app/search_results.html', context)
 
 
+def render_stream_page(request, context):
+    """
+    Render the search results page around its streamed cards.
+
+    Args:
+        request: The HTTP request object
+        context (dict): Template context of the page
+
+    Returns:
+        tuple: (head, tail), the page before and after the cards
+    """
+    page = render_to_string(
+        'sticky_notes_app/search_results.html',
+        dict(context, streaming=True, stream_placeholder=STREAM_PLACEHOLDER),
+        request=request,
+    )
+    head, tail = page.split(STREAM_PLACEHOLDER, 1)
+    return head, tail
+
+
+def stream_search_results(request, notes, context):
+    """
+    Stream every search result as rendered note cards.
+
+    The results page is rendered once around a placeholder; the part before
+    it is sent first, then the cards as rows are read in chunks, then the
+    rest of the page. Memory use does not grow with the number of matches.
+
+    Args:
+        request: The HTTP request object
+        notes (QuerySet): The filtered notes to stream
+        context (dict): Template context for the surrounding page
+
+    Returns:
+        StreamingHttpResponse: The streamed results page
+    """
+    head, tail = render_stream_page(request, context)
+    # Rows are read after the view returns; keep the request's database
+    notes = notes.using(notes.db)
+
+    def render_page():
+        yield head
+        rows = notes.iterator(chunk_size=STREAM_CHUNK_SIZE)
+        found = False
+        while chunk := list(islice(rows, STREAM_CHUNK_SIZE)):
+            found = True
+            yield ''.join(render_note_cards(chunk))
+        if not found:
+            yield render_to_string('sticky_notes_app/search_empty.html')
+        yield tail
+
+    return StreamingHttpResponse(render_page())
+
+
+@require_GET
+def note_card(request, pk):
+    """
+    Render the card of a single active note.
+
+    The note list fetches cards from here to replace notes that change
+    while it is open (see events.py); the card comes from the same
+    fragment cache as the list.
+
+    Args:
+        request: The HTTP request object
+        pk (int): Primary key of the note
+
+    Returns:
+        HttpResponse: The card HTML fragment
+
+    Raises:
+        Http404: If the note does not exist or is archived
+    """
+    note = Note.objects.active().for_cards().filter(pk=pk).first()
+    if note is None:
+        raise Http404("No note found matching the query.")
+    return HttpResponse(render_note_cards([note])[0])
+
+
+@require_GET
+def cache_stats(request):
+    """
+    Report the hit and miss counters of the note caches.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: Counters for the card and page caches
+    """
+    return JsonResponse(get_cache_stats())
+
+
 def home(request):
     """
     Home page view that redirects to the note list.
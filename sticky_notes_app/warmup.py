@@ -0,0 +1,73 @@
+"""
+Worker warm-up for the sticky_notes_app.
+
+The cached template loader reads and compiles a template the first time
+it is used and keeps it for the life of the process, so every new worker
+pays for parsing ``base.html``, ``note_list.html`` and the rest during its
+first requests. warm_up_templates() compiles the app's templates ahead of
+time, and warm_up_urls() imports the URLconf (with the views) and compiles
+its patterns, which Django also leaves to the first request.
+
+wsgi.py and asgi.py call warm_up(), which does both when the
+STICKY_NOTES_TEMPLATE_WARMUP setting is on; under ``gunicorn --preload``
+that happens once in the master, before the workers are forked.
+"""
+
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver
+
+# Apps whose templates are compiled by warm_up()
+WARMUP_APPS = ('sticky_notes_app',)
+
+
+def template_names(app_label):
+    """
+    List the templates shipped by an app.
+
+    Args:
+        app_label (str): Label of an installed app
+
+    Returns:
+        list: Template names, as passed to get_template(), sorted
+    """
+    root = Path(apps.get_app_config(app_label).path) / 'templates'
+    return sorted(
+        path.relative_to(root).as_posix() for path in root.rglob('*.html')
+    )
+
+
+def warm_up_templates(app_labels=WARMUP_APPS):
+    """
+    Compile the templates of some apps into the template loaders' caches.
+
+    Args:
+        app_labels (tuple): Labels of the apps whose templates to compile
+
+    Returns:
+        list: Names of the compiled templates
+    """
+    names = [name for label in app_labels for name in template_names(label)]
+    for engine in engines.all():
+        if isinstance(engine, DjangoTemplates):
+            for name in names:
+                engine.get_template(name)
+    return names
+
+
+def warm_up_urls():
+    """Import the URLconf and compile the patterns that reverse() uses."""
+    resolver = get_resolver()
+    # Populating the root resolver populates the included ones too
+    return resolver.reverse_dict
+
+
+def warm_up():
+    """Warm up templates and URLs if STICKY_NOTES_TEMPLATE_WARMUP is on."""
+    if getattr(settings, 'STICKY_NOTES_TEMPLATE_WARMUP', False):
+        warm_up_templates()
+        warm_up_urls()
@@ -13,5 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE',
                       'sticky_notes_project.settings')
+# Serve the main pages with their async views (ASYNC_VIEWS=False opts out)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+# Persistent connections would pile up in the threads running the database
+# work of each request; use DB_POOL=True to reuse connections
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
+
+# Compile the templates now rather than during the first requests
+from sticky_notes_app.warmup import warm_up  # noqa: E402
+
+warm_up()
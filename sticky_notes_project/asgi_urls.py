@@ -0,0 +1,13 @@
+"""
+URL configuration of sticky_notes_project with the async views.
+
+Used as ROOT_URLCONF when the STICKY_NOTES_ASYNC_VIEWS setting is on; see
+urls.py for the synchronous configuration.
+"""
+from django.contrib import admin
+from django.urls import path, include
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include('sticky_notes_app.async_urls')),
+]
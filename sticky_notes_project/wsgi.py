@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sticky_notes_project.settings')
 
 application = get_wsgi_application()
+
+# Compile the templates now rather than during the first requests
+from sticky_notes_app.warmup import warm_up  # noqa: E402
+
+warm_up()